@@ -0,0 +1,38 @@
+import random
+
+
+class AliasTable:
+    """Walker/Vose alias table for drawing an index with given relative weights.
+
+    Building the table is O(n); every draw costs O(1) and a single call to
+    the generator's random().
+    """
+
+    def __init__(self, weights):
+        weights = list(weights)
+        size = len(weights)
+        total = sum(weights)
+        if not size or total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative with a positive sum")
+
+        scaled = [weight * size / total for weight in weights]
+        prob = [1.0] * size
+        alias = list(range(size))
+        small = [index for index, value in enumerate(scaled) if value < 1]
+        large = [index for index, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] += scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+
+        self.size = size
+        self.prob = prob     # Chance of keeping the column's own index
+        self.alias = alias   # Index used otherwise
+
+    def sample(self, rng=random):
+        position = rng.random() * self.size
+        index = int(position)
+        return index if position - index < self.prob[index] else self.alias[index]
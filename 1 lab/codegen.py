@@ -0,0 +1,76 @@
+# Turns a deterministic automaton into the source of a Python function specialised for it,
+# so acceptance needs no (state, char) tuple per character and no generic table walk
+
+# Above this size an if/elif chain per state gets slower than one dict per state
+MAX_BRANCH_STATES = 8
+
+
+def generate_source(transitions, start, accept_states, name='accepts'):
+    # Return the source of name(string) -> bool for the DFA given as
+    # (state, symbol, next_state) triples; state labels may be any hashable values
+    moves, accepting = _number(transitions, start, accept_states)
+    if len(moves) <= MAX_BRANCH_STATES:
+        return _branch_source(moves, accepting, name)
+    return _table_source(moves, accepting, name)
+
+
+def compile_matcher(transitions, start, accept_states, name='accepts'):
+    # Compile the generated source once and return the function; its text is kept
+    # on the function as __source__ for inspection
+    source = generate_source(transitions, start, accept_states, name)
+    namespace = {}
+    exec(compile(source, f'<dfa {name}>', 'exec'), namespace)
+    function = namespace[name]
+    function.__source__ = source
+    return function
+
+
+def _number(transitions, start, accept_states):
+    # Number states from 0 (the start) in order of first appearance
+    numbers = {start: 0}
+    moves = [{}]
+    for state, symbol, next_state in transitions:
+        for label in (state, next_state):
+            if label not in numbers:
+                numbers[label] = len(moves)
+                moves.append({})
+        targets = moves[numbers[state]]
+        if targets.setdefault(symbol, numbers[next_state]) != numbers[next_state]:
+            raise ValueError(f"Automaton is not deterministic in state {state!r} on {symbol!r}")
+    accepting = sorted(numbers[state] for state in accept_states if state in numbers)
+    return moves, accepting
+
+
+def _branch_source(moves, accepting, name):
+    lines = [f'def {name}(string):',
+             '    state = 0',
+             '    for char in string:']
+    keyword = 'if'
+    for state, targets in enumerate(moves):
+        lines.append(f'        {keyword} state == {state}:')
+        keyword = 'elif'
+        if not targets:
+            lines.append('            return False')
+            continue
+        inner = 'if'
+        for symbol, next_state in sorted(targets.items()):
+            lines.append(f'            {inner} char == {symbol!r}:')
+            lines.append(f'                state = {next_state}')
+            inner = 'elif'
+        lines.append('            else:')
+        lines.append('                return False')
+    lines.append(f'    return state in {set(accepting)!r}' if accepting else '    return False')
+    return '\n'.join(lines) + '\n'
+
+
+def _table_source(moves, accepting, name):
+    rows = ', '.join(repr(dict(sorted(targets.items()))) for targets in moves)
+    return '\n'.join([
+        f'def {name}(string, rows=({rows},), accepting={frozenset(accepting)!r}):',
+        '    state = 0',
+        '    for char in string:',
+        '        state = rows[state].get(char)',
+        '        if state is None:',
+        '            return False',
+        '    return state in accepting',
+    ]) + '\n'
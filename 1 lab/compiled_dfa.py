@@ -0,0 +1,266 @@
+import mmap
+import struct
+from itertools import islice
+
+import numpy as np
+
+# Binary layout, all little-endian: a 32-byte header (magic, format version, flags,
+# table rows, table columns, start state code, two reserved fields), the uint32
+# transition table in row-major order, the alphabet as uint32 code points and the
+# accepting states as a packed bitmap over the table rows.
+_MAGIC = b'CDFA'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHIIIIQ')
+
+
+class CompiledDFA:
+    """Table-driven form of a deterministic finite automaton.
+
+    States are numbered 0..n-1 in breadth-first order from the start state and
+    an extra dead state n absorbs every missing transition. Symbols are numbered
+    by their sorted order; one more column catches characters outside the
+    alphabet and always leads to the dead state.
+    """
+
+    def __init__(self, states, alphabet, table, start, accepting):
+        # Original state labels, index = state code; None when the codes are the labels
+        self.states = None if states is None else tuple(states)
+        self.alphabet = tuple(alphabet)    # Input symbols, index = symbol code
+        self.table = table                 # uint32 matrix (n + 1) x (|alphabet| + 1)
+        self.start = start                 # Code of the initial state
+        self.accepting = accepting         # bool vector (or _Bitmap) over the n + 1 state codes
+        self.dead = len(table) - 1
+        self.unknown = len(self.alphabet)
+        self.symbol_codes = {symbol: code for code, symbol in enumerate(self.alphabet)}
+
+        # Dense code point -> symbol code lookup used to encode whole batches at once;
+        # its last entry is unknown, so clipping sends every larger code point there
+        size = max(map(ord, self.alphabet), default=-1) + 1
+        self.lookup = np.full(size + 1, self.unknown, dtype=np.uint32)
+        for code, symbol in enumerate(self.alphabet):
+            self.lookup[ord(symbol)] = code
+
+        # Same lookup over single bytes, for scanning raw ASCII/Latin-1 buffers
+        self.byte_lookup = np.full(256, self.unknown, dtype=np.uint32)
+        self.byte_lookup[:min(size, 256)] = self.lookup[:min(size, 256)]
+
+        self._rows = None
+        self._counter = None
+        self._matcher = None
+
+    def __getstate__(self):
+        # Derived caches are rebuilt on demand rather than pickled
+        state = self.__dict__.copy()
+        state['_rows'] = None
+        state['_counter'] = None
+        state['_matcher'] = None
+        return state
+
+    @classmethod
+    def from_transitions(cls, transitions, start, accept_states, alphabet=()):
+        # Build the tables from (state, symbol, next_state) triples
+        moves = {}
+        symbols = set(alphabet)
+        for state, symbol, next_state in transitions:
+            if moves.setdefault((state, symbol), next_state) != next_state:
+                raise ValueError(f"Automaton is not deterministic in state {state!r} on {symbol!r}")
+            symbols.add(symbol)
+        for symbol in symbols:
+            if not isinstance(symbol, str) or len(symbol) != 1:
+                raise ValueError(f"Only single-character symbols can be compiled, got {symbol!r}")
+        symbols = sorted(symbols)
+
+        # Number the reachable states in breadth-first order
+        codes = {start: 0}
+        states = [start]
+        for state in states:
+            for symbol in symbols:
+                next_state = moves.get((state, symbol))
+                if next_state is not None and next_state not in codes:
+                    codes[next_state] = len(states)
+                    states.append(next_state)
+
+        dead = len(states)
+        table = np.full((dead + 1, len(symbols) + 1), dead, dtype=np.uint32)
+        for row, state in enumerate(states):
+            for column, symbol in enumerate(symbols):
+                next_state = moves.get((state, symbol))
+                if next_state is not None:
+                    table[row, column] = codes[next_state]
+
+        accepting = np.zeros(dead + 1, dtype=bool)
+        for state in accept_states:
+            if state in codes:
+                accepting[codes[state]] = True
+
+        return cls(states, symbols, table, 0, accepting)
+
+    def save(self, path):
+        # Write the tables in the versioned binary format described at the top of the module
+        rows, columns = self.table.shape
+        with open(path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, 0, rows, columns, self.start, 0, 0))
+            file.write(np.ascontiguousarray(self.table, dtype='<u4').tobytes())
+            file.write(np.array([ord(symbol) for symbol in self.alphabet], dtype='<u4').tobytes())
+            file.write(np.packbits(self.accepting).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        # Map a saved automaton into memory. The transition table and the accepting
+        # bitmap are read-only views of the mapping, so processes loading the same
+        # file share its pages; the state codes serve as labels.
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(mapped) < _HEADER.size:
+                raise ValueError(f"{path} is not a compiled automaton")
+            magic, version, _, rows, columns, start, _, _ = _HEADER.unpack_from(mapped)
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a compiled automaton")
+            if version != _VERSION:
+                raise ValueError(f"Unsupported compiled automaton version {version} in {path}")
+
+            table_offset = _HEADER.size
+            alphabet_offset = table_offset + 4 * rows * columns
+            accepting_offset = alphabet_offset + 4 * (columns - 1)
+            if len(mapped) != accepting_offset + (rows + 7) // 8:
+                raise ValueError(f"{path} is truncated or corrupted")
+        except ValueError:
+            mapped.close()
+            raise
+
+        table = np.frombuffer(mapped, dtype='<u4', count=rows * columns, offset=table_offset)
+        code_points = np.frombuffer(mapped, dtype='<u4', count=columns - 1, offset=alphabet_offset)
+        bitmap = np.frombuffer(mapped, dtype=np.uint8, offset=accepting_offset)
+        alphabet = [chr(code_point) for code_point in code_points.tolist()]
+        return cls(None, alphabet, table.reshape(rows, columns), start, _Bitmap(bitmap, rows))
+
+    def encode(self, text):
+        # Map every character of text to its symbol code in one vectorized pass
+        code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        return np.take(self.lookup, code_points, mode='clip')
+
+    @property
+    def rows(self):
+        # One memoryview per table row, for per-character stepping as rows[state][code].
+        # The views share the table's memory, so a mapped table is never copied.
+        if self._rows is None:
+            rows, columns = self.table.shape
+            cells = memoryview(np.ascontiguousarray(self.table, dtype=np.uint32).reshape(-1))
+            self._rows = [cells[row * columns:(row + 1) * columns] for row in range(rows)]
+        return self._rows
+
+    @property
+    def counter(self):
+        # Per-length counting, uniform sampling and enumeration (see counting.py)
+        if self._counter is None:
+            from counting import LanguageCounter
+            self._counter = LanguageCounter(self)
+        return self._counter
+
+    @property
+    def matcher(self):
+        # Generated Python function accepting the same strings (see codegen.py)
+        if self._matcher is None:
+            from codegen import compile_matcher
+            rows = self.rows
+            transitions = ((state, symbol, rows[state][code])
+                           for state in range(self.dead)
+                           for code, symbol in enumerate(self.alphabet)
+                           if rows[state][code] != self.dead)
+            accept_states = [state for state in range(self.dead) if self.accepting[state]]
+            self._matcher = compile_matcher(transitions, self.start, accept_states)
+        return self._matcher
+
+    def run(self, string, state=None):
+        # Return the state code reached after reading string
+        rows = self.rows
+        codes = self.symbol_codes
+        unknown = self.unknown
+        state = self.start if state is None else state
+        for char in string:
+            state = rows[state][codes.get(char, unknown)]
+        return state
+
+    def accepts(self, string):
+        return bool(self.accepting[self.run(string)])
+
+    def accepts_many(self, strings, batch_size=1 << 14):
+        # Check a whole batch of strings; returns a bool array. Strings are joined,
+        # encoded and run batch_size at a time, so the temporary arrays stay the
+        # size of one slice however many strings there are.
+        strings = iter(strings)
+        results = []
+        while True:
+            batch = list(islice(strings, batch_size))
+            if not batch:
+                break
+            lengths = np.fromiter(map(len, batch), dtype=np.int64, count=len(batch))
+            offsets = np.zeros(len(batch), dtype=np.int64)
+            np.cumsum(lengths[:-1], out=offsets[1:])
+            states = self.run_encoded(self.encode(''.join(batch)), offsets, lengths)
+            results.append(self.accepting[states])
+        return np.concatenate(results) if results else np.zeros(0, dtype=bool)
+
+    def run_encoded(self, codes, offsets, lengths, states=None):
+        # Run every record codes[offsets[i]:offsets[i] + lengths[i]] from states[i]
+        # (the start state by default) and return the final states.
+        # Records are advanced together, one character column at a time; ordering
+        # them by decreasing length keeps the still-running ones a prefix of the vector.
+        count = len(lengths)
+        if states is None:
+            states = np.full(count, self.start, dtype=np.uint32)
+        else:
+            states = np.array(states, dtype=np.uint32)
+        if not count:
+            return states
+
+        order = np.argsort(-lengths, kind='stable')
+        sorted_lengths = lengths[order]
+        positions = offsets[order]
+        running_states = states[order]
+        longest = int(sorted_lengths[0])
+        active = np.searchsorted(-sorted_lengths, -np.arange(longest), side='left')
+
+        table = self.table
+        for step in range(longest):
+            running = active[step]
+            running_states[:running] = table[running_states[:running], codes[positions[:running] + step]]
+
+        states[order] = running_states
+        return states
+
+
+def compiled(automaton):
+    # Accept a CompiledDFA, the path of a saved one, or any automaton that can compile itself
+    if isinstance(automaton, CompiledDFA):
+        return automaton
+    if isinstance(automaton, str) or hasattr(automaton, '__fspath__'):
+        return CompiledDFA.load(automaton)
+    return automaton.compile()
+
+
+class _Bitmap:
+    """Read-only bool vector stored as a packed bitmap in np.packbits order.
+
+    Used for the accepting states of a loaded automaton, which stay a view of
+    the mapped file. Indexing with a code or an array of codes works as on a
+    bool array.
+    """
+
+    def __init__(self, bits, length):
+        self.bits = bits
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, codes):
+        codes = np.asarray(codes)
+        return ((self.bits[codes >> 3] >> (7 - (codes & 7))) & 1).astype(bool)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.unpackbits(self.bits, count=self.length).astype(dtype or bool)
+
+    def tolist(self):
+        return np.asarray(self).tolist()
@@ -0,0 +1,76 @@
+import random
+
+
+class LanguageCounter:
+    """Counts, samples and enumerates the strings of each length a compiled DFA accepts.
+
+    counts[k][s] is the number of strings of length k that lead from state s to
+    acceptance. Rows are computed on demand and kept, so asking for length n
+    costs O(n * states * symbols) once and nothing afterwards. Counts are exact
+    Python integers.
+    """
+
+    def __init__(self, dfa):
+        self.dfa = dfa
+        dead = dfa.dead
+        # Live successors of each state, one (symbol, next state) pair per symbol
+        self.moves = [[(dfa.alphabet[code], next_state) for code, next_state in enumerate(row[:dfa.unknown])
+                       if next_state != dead]
+                      for row in dfa.rows]
+        self.counts = [[int(accepting) for accepting in dfa.accepting.tolist()]]
+
+    def _extend(self, length):
+        while len(self.counts) <= length:
+            previous = self.counts[-1]
+            self.counts.append([sum(previous[next_state] for _, next_state in moves) for moves in self.moves])
+
+    def count(self, length):
+        # Number of accepted strings of exactly this length
+        self._extend(length)
+        return self.counts[length][self.dfa.start]
+
+    def sample(self, length, rng=None):
+        # Draw one accepted string of exactly this length, every one equally likely
+        rng = rng if rng is not None else random
+        total = self.count(length)
+        if not total:
+            raise ValueError(f"The language has no strings of length {length}")
+        state = self.dfa.start
+        symbols = []
+        for remaining in range(length - 1, -1, -1):
+            below = self.counts[remaining]
+            pick = rng.randrange(self.counts[remaining + 1][state])
+            for symbol, next_state in self.moves[state]:
+                pick -= below[next_state]
+                if pick < 0:
+                    symbols.append(symbol)
+                    state = next_state
+                    break
+        return ''.join(symbols)
+
+    def enumerate(self, max_length):
+        # Yield every accepted string of length 0..max_length, shortest first and in
+        # alphabet order within a length; branches with no accepted completion are skipped
+        self._extend(max_length)
+        for length in range(max_length + 1):
+            if not self.counts[length][self.dfa.start]:
+                continue
+            prefix = []
+            stack = [(self.dfa.start, length, iter(self.moves[self.dfa.start]))]
+            while stack:
+                state, remaining, moves = stack[-1]
+                if not remaining:
+                    yield ''.join(prefix)
+                    stack.pop()
+                    if prefix:
+                        prefix.pop()
+                    continue
+                for symbol, next_state in moves:
+                    if self.counts[remaining - 1][next_state]:
+                        prefix.append(symbol)
+                        stack.append((next_state, remaining - 1, iter(self.moves[next_state])))
+                        break
+                else:
+                    stack.pop()
+                    if prefix:
+                        prefix.pop()
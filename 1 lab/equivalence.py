@@ -0,0 +1,124 @@
+from collections import deque
+
+from compiled_dfa import compiled
+
+
+class _Stepper:
+    # Uniform step/accept interface over a CompiledDFA, for symbols of any alphabet
+    def __init__(self, dfa):
+        self.start = dfa.start
+        self.rows = dfa.rows
+        self.codes = dfa.symbol_codes
+        self.unknown = dfa.unknown
+        self.accepting = dfa.accepting.tolist()
+
+    def step(self, state, symbol):
+        return self.rows[state][self.codes.get(symbol, self.unknown)]
+
+    def is_accepting(self, state):
+        return self.accepting[state]
+
+
+class _UnionStepper:
+    # Product automaton for L(first) | L(second), with pair states built as they are reached
+    def __init__(self, first, second):
+        self.first = first
+        self.second = second
+        self.start = (first.start, second.start)
+
+    def step(self, state, symbol):
+        return self.first.step(state[0], symbol), self.second.step(state[1], symbol)
+
+    def is_accepting(self, state):
+        return self.first.is_accepting(state[0]) or self.second.is_accepting(state[1])
+
+
+def equivalent(a, b):
+    """Check whether two automata accept the same language.
+
+    Returns (True, None), or (False, word) with a shortest word accepted by
+    exactly one of them. Automata may be CompiledDFA objects, saved CompiledDFA
+    paths or anything with a compile() method.
+    """
+    a, b = compiled(a), compiled(b)
+    first, second = _Stepper(a), _Stepper(b)
+    symbols = sorted(set(a.alphabet) | set(b.alphabet))
+    if _hopcroft_karp(first, second, symbols):
+        return True, None
+    return False, _shortest_witness(first, second, symbols,
+                                    lambda left, right: left != right)
+
+
+def includes(a, b):
+    """Check whether the language of a includes the language of b.
+
+    Returns (True, None), or (False, word) with a shortest word accepted by b
+    but not by a. L(b) is included in L(a) exactly when a and the union of a
+    and b are equivalent, which Hopcroft-Karp decides on the lazily built union.
+    """
+    a, b = compiled(a), compiled(b)
+    first, second = _Stepper(a), _Stepper(b)
+    symbols = sorted(set(a.alphabet) | set(b.alphabet))
+    if _hopcroft_karp(first, _UnionStepper(first, second), symbols):
+        return True, None
+    return False, _shortest_witness(first, second, symbols,
+                                    lambda left, right: right and not left)
+
+
+def _hopcroft_karp(first, second, symbols):
+    # Merge the classes of paired states with union-find (by size, with path halving);
+    # a pair is only explored when it joins two classes, so at most
+    # |first| + |second| - 1 pairs are ever queued.
+    parent = {}
+    size = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(left, right):
+        left, right = find(left), find(right)
+        if left == right:
+            return False
+        if size.get(left, 1) < size.get(right, 1):
+            left, right = right, left
+        parent[right] = left
+        size[left] = size.get(left, 1) + size.get(right, 1)
+        return True
+
+    union((0, first.start), (1, second.start))
+    pairs = deque([(first.start, second.start)])
+    while pairs:
+        left, right = pairs.popleft()
+        if first.is_accepting(left) != second.is_accepting(right):
+            return False
+        for symbol in symbols:
+            next_left, next_right = first.step(left, symbol), second.step(right, symbol)
+            if union((0, next_left), (1, next_right)):
+                pairs.append((next_left, next_right))
+    return True
+
+
+def _shortest_witness(first, second, symbols, differs):
+    # Breadth-first search of the product for the first pair whose acceptance
+    # flags satisfy differs; only run once Hopcroft-Karp has found a difference
+    start = (first.start, second.start)
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        pair = queue.popleft()
+        if differs(first.is_accepting(pair[0]), second.is_accepting(pair[1])):
+            word = []
+            while parents[pair] is not None:
+                pair, symbol = parents[pair]
+                word.append(symbol)
+            return ''.join(reversed(word))
+        for symbol in symbols:
+            next_pair = (first.step(pair[0], symbol), second.step(pair[1], symbol))
+            if next_pair not in parents:
+                parents[next_pair] = (pair, symbol)
+                queue.append(next_pair)
+    return None
@@ -1,4 +1,5 @@
 # V27
+import functools
 import random
 
 # Define the grammar rules
@@ -13,21 +14,136 @@ P = {
 
 # Define a class for the grammar
 class Grammar:
-    def __init__(self, vn, vt, p):
+    def __init__(self, vn, vt, p, weights=None):
         self.vn = vn
         self.vt = vt
         self.p = p
+        # Optional relative weights per nonterminal, parallel to its productions;
+        # nonterminals without weights choose uniformly
+        self.weights = weights if weights is not None else {}
 
-    def generate_string(self, symbol):
-        if symbol in self.vt:
-            return symbol
-        else:
-            options = self.p[symbol]
-            chosen_option = random.choice(options)
-            generated_string = ""
-            for char in chosen_option:
-                generated_string += self.generate_string(char)
-            return generated_string
+    # Expansion tables and shortest lengths are built once and dropped when p or
+    # weights is reassigned; reassign them after editing either in place
+    @property
+    def p(self):
+        return self._p
+
+    @p.setter
+    def p(self, p):
+        self._p = p
+        self._prepared = None
+
+    @property
+    def weights(self):
+        return self._weights
+
+    @weights.setter
+    def weights(self, weights):
+        self._weights = weights
+        self._prepared = None
+
+    def _prepare(self):
+        if self._prepared is None:
+            self._prepared = (self._expansions(), self._shortest_lengths())
+        return self._prepared
+
+    def generate_string(self, symbol, rng=None, max_length=None):
+        # Derive a random string from symbol. rng may be a seed or a random.Random;
+        # returns None if the derivation grows past max_length terminals.
+        expansions, _ = self._prepare()
+        return self._derive(symbol, expansions, _make_rng(rng), max_length, [])
+
+    def generate_many(self, n, symbol="S", rng=None, max_length=None):
+        # Lazily yield n derived strings, sharing one output buffer between them.
+        # Derivations cut off by max_length are discarded and started again, so a
+        # max_length below the shortest string symbol derives is a ValueError.
+        expansions, shortest = self._prepare()
+        if symbol not in shortest:
+            raise ValueError(f"{symbol!r} derives no terminal string")
+        if max_length is not None and shortest[symbol] > max_length:
+            raise ValueError(f"Strings derived from {symbol!r} have at least {shortest[symbol]} "
+                             f"terminals, more than max_length={max_length}")
+        return self._generate_many(n, symbol, expansions, _make_rng(rng), max_length)
+
+    def _generate_many(self, n, symbol, expansions, rng, max_length):
+        buffer = []
+        produced = 0
+        while produced < n:
+            generated = self._derive(symbol, expansions, rng, max_length, buffer)
+            if generated is not None:
+                produced += 1
+                yield generated
+
+    def _shortest_lengths(self):
+        # Fewest terminals each nonterminal can derive, by relaxing every production
+        # until nothing changes; productions with zero weight are never chosen and
+        # nonterminals that cannot finish a derivation are left out
+        lengths = {}
+        changed = True
+        while changed:
+            changed = False
+            for symbol, rules in self.p.items():
+                weights = self.weights.get(symbol)
+                for number, rule in enumerate(rules):
+                    if weights is not None and not weights[number]:
+                        continue
+                    length = 0
+                    for char in rule:
+                        if char in self.vt:
+                            length += 1
+                        elif char in lengths:
+                            length += lengths[char]
+                        else:
+                            break
+                    else:
+                        if symbol not in lengths or length < lengths[symbol]:
+                            lengths[symbol] = length
+                            changed = True
+        return lengths
+
+    def _expansions(self):
+        # For every nonterminal: its productions reversed, ready to be pushed onto the
+        # derivation stack, and the alias table columns used to pick one of them
+        from alias import AliasTable
+        expansions = {}
+        for symbol, rules in self.p.items():
+            weights = self.weights.get(symbol)
+            if weights is not None and len(weights) != len(rules):
+                raise ValueError(f"Expected {len(rules)} weights for {symbol!r}, got {len(weights)}")
+            table = AliasTable(weights if weights is not None else [1] * len(rules))
+            expansions[symbol] = ([tuple(reversed(rule)) for rule in rules], table.prob, table.alias, table.size)
+        return expansions
+
+    def _derive(self, symbol, expansions, rng, max_length, buffer):
+        # Leftmost derivation with an explicit stack instead of recursion; the alias
+        # table draw is inlined since it runs once per expanded nonterminal
+        buffer.clear()
+        stack = [symbol]
+        terminals = self.vt
+        draw = rng.random
+        while stack:
+            current = stack.pop()
+            if current in terminals:
+                buffer.append(current)
+                if max_length is not None and len(buffer) > max_length:
+                    return None
+            else:
+                rules, prob, alias, size = expansions[current]
+                position = draw() * size
+                index = int(position)
+                if position - index >= prob[index]:
+                    index = alias[index]
+                stack.extend(rules[index])
+        return ''.join(buffer)
+
+
+def _make_rng(rng):
+    # None means the shared module-level generator, an int seeds a new one
+    if rng is None:
+        return random
+    if isinstance(rng, int):
+        return random.Random(rng)
+    return rng
 
 
 # Create an instance of the Grammar class
@@ -40,25 +156,41 @@ for _ in range(5):
     print(generated_string)
 
 
-# Convert grammar to Finite Automaton
-def grammar_to_finite_automaton(grammar):
-    states = grammar.vn
-    alphabet = grammar.vt
+# Convert grammar to Finite Automaton. The automata of the most recently used grammars
+# are kept, so the returned automaton is shared between callers with equal grammars and
+# must not be modified; a caller that keeps its own automaton can pass cached=False to
+# build a private one without computing the cache key.
+def grammar_to_finite_automaton(grammar, cached=True):
+    if not cached:
+        return _build_finite_automaton(grammar.vn, grammar.vt, grammar.p)
+    # Rule order is part of the key: the special case below picks the first rule
+    productions = tuple((state, tuple(rules)) for state, rules in grammar.p.items())
+    return _cached_finite_automaton(frozenset(grammar.vn), frozenset(grammar.vt), productions)
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_finite_automaton(vn, vt, productions):
+    return _build_finite_automaton(vn, vt, dict(productions))
+
+
+def _build_finite_automaton(vn, vt, p):
+    states = vn
+    alphabet = vt
     start_state = "S"  #'S' is the start symbol
     accept_states = {
-        state for state, rules in grammar.p.items() if any(r in rules for r in grammar.vt)
+        state for state, rules in p.items() if any(r in rules for r in vt)
     }
 
     transitions = {}
-    for state, rules in grammar.p.items():
+    for state, rules in p.items():
         for rule in rules:
             if len(rule) == 2:  # Production X -> aY   
                 transitions[(state, rule[0])] = rule[1] 
             elif len(rule) == 1: 
-                if rule[0] in grammar.vt:  # Simple terminal case
+                if rule[0] in vt:  # Simple terminal case
                     transitions[(state, rule[0])] = rule[0]                   
                 else:                    # Special Case for new transitions like 'A'->'bS' 
-                    transitions[(state, rule[0])] = next(iter(grammar.p[rule[0]]))[0] 
+                    transitions[(state, rule[0])] = next(iter(p[rule[0]]))[0] 
                 
 
     return FiniteAutomaton(states, alphabet, transitions, start_state, accept_states)
@@ -75,6 +207,8 @@ class FiniteAutomaton:
         self.transitions = transitions
         self.start_state = start_state
         self.accept_states = accept_states
+        self._compiled = None  # Tables built by compile()
+        self._matcher = None   # Function built by specialize()
 
     def accepts(self, string):
         current_state = self.start_state
@@ -84,6 +218,32 @@ class FiniteAutomaton:
             current_state = self.transitions[(current_state, char)]
         return current_state in self.accept_states
 
+    def compile(self):
+        # Compile the automaton into integer-coded tables for fast batch acceptance (requires NumPy).
+        # The tables are built once and reused by later calls.
+        if self._compiled is None:
+            from compiled_dfa import CompiledDFA
+            transitions = ((state, char, next_state) for (state, char), next_state in self.transitions.items())
+            self._compiled = CompiledDFA.from_transitions(transitions, self.start_state, self.accept_states, self.alphabet)
+        return self._compiled
+
+    def specialize(self):
+        # Return a Python function generated for this automaton that behaves like accepts()
+        # but avoids building and hashing a (state, char) tuple per character.
+        # It is compiled on the first call and reused afterwards.
+        if self._matcher is None:
+            from codegen import compile_matcher
+            transitions = ((state, char, next_state) for (state, char), next_state in self.transitions.items())
+            self._matcher = compile_matcher(transitions, self.start_state, self.accept_states)
+        return self._matcher
+
+
+# Check many strings against a grammar, spread over a pool of worker processes.
+# The compiled automaton is sent to each worker once, not with every chunk.
+def accepts_batch(grammar, strings, workers=None, chunk_size=65536):
+    from parallel import accepts_parallel
+    return accepts_parallel(grammar_to_finite_automaton(grammar), strings, workers, chunk_size)
+
 
 # Test strings
 test_strings = ["aabbc", "ac", "abba", "acaaaabba", "aab"]
@@ -1,5 +1,112 @@
 import random
 
+EPSILON = 'ε'
+
+
+class TransitionSet(set):
+    # Set of (state, symbol, next_state) triples that keeps an index
+    # state -> symbol -> set of next states in sync with its contents, and a
+    # version number that changes with them
+    def __init__(self, transitions=()):
+        super().__init__()
+        self.index = {}
+        self.version = 0
+        self.update(transitions)
+
+    def successors(self, state, symbol):
+        # Return the states reachable from state on symbol (empty if none)
+        return self.index.get(state, {}).get(symbol, ())
+
+    def add(self, transition):
+        size = len(self)
+        super().add(transition)
+        if len(self) == size:
+            return
+        self.version += 1
+        # Look up before creating, so adding to an existing entry allocates nothing
+        state, symbol, next_state = transition
+        by_symbol = self.index.get(state)
+        if by_symbol is None:
+            by_symbol = self.index[state] = {}
+        next_states = by_symbol.get(symbol)
+        if next_states is None:
+            by_symbol[symbol] = {next_state}
+        else:
+            next_states.add(next_state)
+
+    def discard(self, transition):
+        if transition not in self:
+            return
+        super().discard(transition)
+        self._unindex(transition)
+
+    def remove(self, transition):
+        if transition not in self:
+            raise KeyError(transition)
+        self.discard(transition)
+
+    def pop(self):
+        transition = super().pop()
+        self._unindex(transition)
+        return transition
+
+    def clear(self):
+        super().clear()
+        self.index.clear()
+        self.version += 1
+
+    def update(self, *others):
+        for other in others:
+            for transition in other:
+                self.add(transition)
+
+    def difference_update(self, *others):
+        for other in others:
+            for transition in list(other):
+                self.discard(transition)
+
+    def intersection_update(self, *others):
+        super().intersection_update(*others)
+        self._reindex()
+
+    def symmetric_difference_update(self, other):
+        super().symmetric_difference_update(other)
+        self._reindex()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
+
+    def _unindex(self, transition):
+        self.version += 1
+        state, symbol, next_state = transition
+        by_symbol = self.index[state]
+        next_states = by_symbol[symbol]
+        next_states.discard(next_state)
+        if not next_states:
+            del by_symbol[symbol]
+            if not by_symbol:
+                del self.index[state]
+
+    def _reindex(self):
+        self.version += 1
+        self.index.clear()
+        for state, symbol, next_state in self:
+            self.index.setdefault(state, {}).setdefault(symbol, set()).add(next_state)
+
+
 class FiniteAutomaton:
     def __init__(self):
         # Initialize the finite automaton with empty sets
@@ -9,16 +116,41 @@ class FiniteAutomaton:
         self.q0 = None      # Initial state
         self.F = set()      # Set of accepting states
 
+    @property
+    def delta(self):
+        return self._delta
+
+    @delta.setter
+    def delta(self, transitions):
+        # Any assigned collection of triples is wrapped so the index stays current
+        self._delta = TransitionSet(transitions)
+        self._compiled = None
+
+    def epsilon_closure(self, states):
+        # Return all states reachable from the given ones through ε-transitions
+        closure = set(states)
+        stack = list(closure)
+        while stack:
+            for next_state in self.delta.successors(stack.pop(), EPSILON):
+                if next_state not in closure:
+                    closure.add(next_state)
+                    stack.append(next_state)
+        return closure
+
     def string_belongs_to_language(self, input_string):
-        # Check if the input string belongs to the language recognized by the automaton
-        current_state = self.q0
+        # Check if the input string belongs to the language recognized by the automaton.
+        # The automaton is simulated on the whole set of states it can be in, so
+        # non-deterministic choices are never lost.
+        index = self.delta.index
+        current_states = self.epsilon_closure({self.q0})
         for symbol in input_string:
-            next_states = {next_state for (state, input_symbol, next_state) in self.delta
-                           if state == current_state and input_symbol == symbol}
+            next_states = set()
+            for state in current_states:
+                next_states.update(index.get(state, {}).get(symbol, ()))
             if not next_states:
                 return False
-            current_state = next_states.pop()
-        return current_state in self.F
+            current_states = self.epsilon_closure(next_states)
+        return not current_states.isdisjoint(self.F)
 
     def to_regular_grammar(self):
         # Convert the finite automaton to a regular grammar
@@ -38,113 +170,289 @@ class FiniteAutomaton:
         return regular_grammar
 
     def is_deterministic(self):
-        # Check if the automaton is deterministic
-        for state in self.Q:
-            for symbol in self.Sigma:
-                next_states = {next_state for (_, input_symbol, next_state) in self.delta
-                               if _ == state and input_symbol == symbol}
-                if len(next_states) > 1:
+        # Check if the automaton is deterministic: no ε-transitions and at most
+        # one next state for every (state, symbol) pair of the index
+        for transitions in self.delta.index.values():
+            for symbol, next_states in transitions.items():
+                if symbol == EPSILON or len(next_states) > 1:
                     return False
         return True
 
+    def compile(self):
+        # Compile the automaton into integer-coded tables for fast batch acceptance
+        # (requires NumPy); non-deterministic automata are determinized first.
+        # The tables are reused until delta, q0, F or Sigma change.
+        key = (self.delta.version, self.q0, frozenset(self.F), frozenset(self.Sigma))
+        if self._compiled is None or self._compiled[0] != key:
+            from compiled_dfa import CompiledDFA
+            automaton = self if self.is_deterministic() else self.to_deterministic_finite_automaton()
+            self._compiled = key, CompiledDFA.from_transitions(automaton.delta, automaton.q0,
+                                                               automaton.F, automaton.Sigma)
+        return self._compiled[1]
+
+    def lazy(self, cache_size=1024):
+        # Return a view of the automaton that determinizes states only when an
+        # input reaches them, keeping at most cache_size of them (see lazy_dfa.py).
+        # It reads the live transition index, so call cache_clear() after editing delta.
+        from lazy_dfa import LazyDFA
+        return LazyDFA(self.delta.index, self.q0, self.F, cache_size)
+
     def to_deterministic_finite_automaton(self):
         # Convert the non-deterministic finite automaton (NFA) to a deterministic finite automaton (DFA)
+        # with the bitset subset construction of subset_construction.py. DFA states are the
+        # frozensets of NFA states, starting from the epsilon closure of the initial state.
+        from subset_construction import subset_construction, decode
+        symbols = set(self.Sigma)
+        for moves in self.delta.index.values():
+            symbols.update(moves)
+        subsets = subset_construction(self.delta.index, self.q0, self.F, symbols)
+        labels = [decode(mask, subsets.nfa_states) for mask in subsets.masks]
+
         dfa = FiniteAutomaton()
         dfa.Sigma = self.Sigma
-        dfa.q0 = frozenset([self.q0])  # Initial state is the epsilon closure of the original initial state
-        dfa.F = set()
-        dfa.Q = set()  # Initialize set of states
-        dfa.delta = set()
-
-        def epsilon_closure(state):
-            # Compute epsilon closure of a state in the NFA
-            closure = set(state)
-            stack = list(state)
-            while stack:
-                currentState = stack.pop()
-                for (_, input_symbol, nextState) in self.delta:
-                    if currentState == nextState and input_symbol == 'ε' and nextState not in closure:
-                        closure.add(nextState)
-                        stack.append(nextState)
-            return frozenset(closure)
-
-        unprocessed_states = [dfa.q0]
-        dfa.Q.add(dfa.q0)
-
-        while unprocessed_states:
-            current_state = unprocessed_states.pop(0)
-            for symbol in dfa.Sigma:
-                next_state = set()
-                for state in current_state:
-                    next_state |= {next_state for (_, input_symbol, next_state) in self.delta
-                                   if state in current_state and input_symbol == symbol}
-                next_state_closure = epsilon_closure(next_state)
-                if next_state_closure:
-                    dfa.delta.add((current_state, symbol, next_state_closure))
-                    if next_state_closure not in dfa.Q:
-                        dfa.Q.add(next_state_closure)
-                        unprocessed_states.append(next_state_closure)
-                    if any(state in self.F for state in next_state_closure):
-                        dfa.F.add(next_state_closure)
-
+        dfa.q0 = labels[0]
+        dfa.Q = set(labels)
+        dfa.F = {labels[number] for number in subsets.accepting}
+        dfa.delta = {(labels[current], symbol, labels[target]) for current, symbol, target in subsets.transitions}
         return dfa
 
+    def minimize(self, relabel=False):
+        # Minimize the automaton with Hopcroft's partition refinement.
+        # States of the result are frozensets of equivalent original states, or
+        # compact integers numbered breadth-first from the start when relabel is set.
+        automaton = self if self.is_deterministic() else self.to_deterministic_finite_automaton()
+        index = automaton.delta.index
+        symbols = sorted(set(automaton.Sigma) | {symbol for moves in index.values() for symbol in moves})
+
+        # Only states reachable from the start matter; a dead state completes the DFA
+        dead = object()
+        reachable = [automaton.q0]
+        seen = {automaton.q0}
+        for state in reachable:
+            for next_states in index.get(state, {}).values():
+                for next_state in next_states:
+                    if next_state not in seen:
+                        seen.add(next_state)
+                        reachable.append(next_state)
+        reachable.append(dead)
+
+        def move(state, symbol):
+            next_states = index.get(state, {}).get(symbol) if state is not dead else None
+            return next(iter(next_states)) if next_states else dead
+
+        inverse = {symbol: {} for symbol in symbols}
+        for state in reachable:
+            for symbol in symbols:
+                inverse[symbol].setdefault(move(state, symbol), []).append(state)
+
+        accepting = {state for state in reachable if state in automaton.F}
+        blocks = [block for block in (set(accepting), set(reachable) - accepting) if block]
+        block_of = {state: number for number, block in enumerate(blocks) for state in block}
+
+        # Start from the smaller initial block; every split only enqueues the smaller half
+        pending = []
+        if len(blocks) == 2:
+            smaller = 0 if len(blocks[0]) <= len(blocks[1]) else 1
+            pending = [(smaller, symbol) for symbol in symbols]
+        queued = set(pending)
+
+        while pending:
+            splitter = pending.pop()
+            queued.discard(splitter)
+            number, symbol = splitter
+            predecessors = inverse[symbol]
+            touched = {}
+            for state in blocks[number]:
+                for source in predecessors.get(state, ()):
+                    touched.setdefault(block_of[source], set()).add(source)
+
+            for split_number, inside in touched.items():
+                block = blocks[split_number]
+                if len(inside) == len(block):
+                    continue
+                # Only the smaller half is copied out, keeping each split proportional to it
+                if 2 * len(inside) <= len(block):
+                    block -= inside
+                    smaller = inside
+                else:
+                    smaller = block - inside
+                    blocks[split_number] = inside
+                blocks.append(smaller)
+                new_number = len(blocks) - 1
+                for state in smaller:
+                    block_of[state] = new_number
+                for letter in symbols:
+                    if (new_number, letter) not in queued:
+                        queued.add((new_number, letter))
+                        pending.append((new_number, letter))
+
+        # Blocks equivalent to the dead state are dropped from the result
+        dead_block = block_of[dead]
+        order = [block_of[automaton.q0]]
+        numbers = {order[0]: 0}
+        for number in order:
+            if number == dead_block:
+                continue
+            for symbol in symbols:
+                target = block_of[move(next(iter(blocks[number])), symbol)]
+                if target != dead_block and target not in numbers:
+                    numbers[target] = len(order)
+                    order.append(target)
+
+        if relabel:
+            labels = {number: numbers[number] for number in order}
+        else:
+            labels = {number: frozenset(blocks[number] - {dead}) for number in order}
+
+        minimal = FiniteAutomaton()
+        minimal.Sigma = set(automaton.Sigma)
+        minimal.Q = set(labels.values())
+        minimal.q0 = labels[order[0]]
+        minimal.F = {labels[number] for number in order if blocks[number] & accepting}
+        minimal.delta = {(labels[number], symbol, labels[block_of[move(next(iter(blocks[number])), symbol)]])
+                         for number in order if number != dead_block
+                         for symbol in symbols
+                         if block_of[move(next(iter(blocks[number])), symbol)] != dead_block}
+        return minimal
+
 class Grammar:
     def __init__(self):
         # Initialize the grammar with empty sets and dictionary
         self.VN = set()  # Set of non-terminals
         self.VT = set()  # Set of terminals
         self.P = {}      # Dictionary of productions
+        self.weights = {}  # Optional relative weights of each non-terminal's productions
+
+    # The production alias tables are built once and dropped when P or weights is
+    # reassigned; reassign them after editing either in place
+    @property
+    def P(self):
+        return self._P
+
+    @P.setter
+    def P(self, productions):
+        self._P = productions
+        self._tables = None
+
+    @property
+    def weights(self):
+        return self._weights
+
+    @weights.setter
+    def weights(self, weights):
+        self._weights = weights
+        self._tables = None
 
     def generate_string(self):
         # Generate strings from the grammar
         generated_strings = []
+        tables = self._production_tables()
         for _ in range(5):
-            generated_string = self._generate_string_helper('S', '')
+            generated_string = self._generate_string_helper('S', '', tables)
             generated_strings.append(generated_string)
         return generated_strings
 
-    def _generate_string_helper(self, symbol, current_string):
+    def _production_tables(self):
+        # Alias tables picking a production of each non-terminal in O(1) by its weight
+        if self._tables is None:
+            self._tables = self._build_production_tables()
+        return self._tables
+
+    def _build_production_tables(self):
+        from alias import AliasTable
+        tables = {}
+        for non_terminal, productions in self.P.items():
+            weights = self.weights.get(non_terminal)
+            if weights is not None and len(weights) != len(productions):
+                raise ValueError(f"Expected {len(productions)} weights for {non_terminal!r}, got {len(weights)}")
+            tables[non_terminal] = AliasTable(weights if weights is not None else [1] * len(productions))
+        return tables
+
+    def _generate_string_helper(self, symbol, current_string, tables=None):
         # Helper function to recursively generate strings
         if symbol in self.VT:
             return current_string + symbol
         else:
+            if tables is None:
+                tables = self._production_tables()
             productions = self.P[symbol]
-            chosen_production = random.choice(productions)
+            chosen_production = productions[tables[symbol].sample(random)]
             for s in chosen_production:
-                current_string = self._generate_string_helper(s, current_string)
+                current_string = self._generate_string_helper(s, current_string, tables)
             return current_string
 
-    def to_finite_automaton(self):
-        # Convert the grammar to a finite automaton
+    def to_finite_automaton(self, start='S'):
+        # Convert a right-linear grammar to a finite automaton in one pass over the productions.
+        # A production is a string or a sequence of symbols: terminals optionally followed by
+        # one non-terminal. A -> a1..ak B becomes a chain of k transitions ending in B, a
+        # production without a non-terminal ends in a fresh final state, A -> B becomes an
+        # ε-transition and A -> ε makes A accepting. Transitions go straight into the
+        # indexed delta of the automaton.
         finite_automaton = FiniteAutomaton()
+        finite_automaton.Sigma = set(self.VT)
+        finite_automaton.q0 = start
 
-        finite_automaton.Q = self.VN.union(self.VT)
-        finite_automaton.Sigma = self.VT
-        finite_automaton.delta = set()
+        # Symbol table of non-terminal names, so multi-character names resolve with one lookup
+        states = {name: name for name in self.VN}
+        states.update((name, name) for name in self.P)
+        final = 'X'
+        while final in states:
+            final += "'"
+        finite_automaton.F = {final}
+        finite_automaton.Q = set(states.values()) | {final}
+        delta = finite_automaton.delta
 
         for non_terminal, productions in self.P.items():
-            for production in productions:
-                if len(production) > 1:
-                    current_state = production[0]
-                    next_state = production[1]
-                    finite_automaton.delta.add((non_terminal, current_state, next_state))
-                else:
-                    if non_terminal in finite_automaton.F:
-                        finite_automaton.delta.add((non_terminal, production, 'X'))
+            source = states[non_terminal]
+            for number, production in enumerate(productions):
+                terminals, target = self._split_production(production, states)
+                if target is None:
+                    target = final
+                if not terminals:
+                    if target == final:
+                        finite_automaton.F.add(source)
                     else:
-                        if production == 'b':
-                            finite_automaton.delta.add((non_terminal, production, 'X'))
-                        elif production == 'd':
-                            finite_automaton.delta.add((non_terminal, production, 'X'))
-                        else:
-                            finite_automaton.delta.add((non_terminal, production, production))
-
-        finite_automaton.q0 = 'S'
-        finite_automaton.F = {'X'}
+                        delta.add((source, EPSILON, target))
+                    continue
+                current = source
+                for position, terminal in enumerate(terminals[:-1]):
+                    # Intermediate states get fresh names, primed like the final state
+                    # until they clash with no other state
+                    next_state = f'{source}_{number}_{position}'
+                    while next_state in states or next_state in finite_automaton.Q:
+                        next_state += "'"
+                    finite_automaton.Q.add(next_state)
+                    delta.add((current, terminal, next_state))
+                    current = next_state
+                delta.add((current, terminals[-1], target))
 
         return finite_automaton
 
+    def _split_production(self, production, states):
+        # Split a production into its terminals and trailing non-terminal (or None)
+        if production == EPSILON:
+            return (), None
+        if isinstance(production, str):
+            # Take the leading run of single-character terminals, backing off if the
+            # rest is not a whole non-terminal name
+            split = 0
+            while split < len(production) and production[split] in self.VT:
+                split += 1
+            while split > 0 and split < len(production) and production[split:] not in states:
+                split -= 1
+            terminals, rest = tuple(production[:split]), production[split:]
+            if rest and rest not in states:
+                raise ValueError(f"Production {production!r} is not right-linear")
+            return terminals, states[rest] if rest else None
+        symbols = tuple(production)
+        if symbols and symbols[-1] in states:
+            terminals, target = symbols[:-1], states[symbols[-1]]
+        else:
+            terminals, target = symbols, None
+        if any(symbol not in self.VT for symbol in terminals):
+            raise ValueError(f"Production {production!r} is not right-linear")
+        return terminals, target
+
     def check_grammar_type(self):
         start_symbol = None
         has_epsilon = False
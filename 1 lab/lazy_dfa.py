@@ -0,0 +1,80 @@
+from collections import OrderedDict, namedtuple
+
+EPSILON = 'ε'
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LazyDFA:
+    """Determinizes an NFA on the fly while strings are being run through it.
+
+    A DFA state is the frozenset of NFA states the automaton can be in. The
+    transitions of a DFA state are computed the first time an input reaches
+    them and kept in a bounded LRU cache; when a state is not cached (or was
+    evicted) its successor is computed again by plain NFA simulation, so memory
+    never grows past cache_size determinized states.
+    """
+
+    def __init__(self, index, start, accept_states, cache_size=1024):
+        self.index = index                  # state -> symbol -> set of next states
+        self.accept_states = frozenset(accept_states)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()          # DFA state -> {symbol: next DFA state}
+        self.hits = 0
+        self.misses = 0
+        self.start = self.closure((start,))
+
+    def closure(self, states):
+        # Extend a set of NFA states with everything reachable through ε-transitions
+        closure = set(states)
+        stack = list(closure)
+        while stack:
+            for next_state in self.index.get(stack.pop(), {}).get(EPSILON, ()):
+                if next_state not in closure:
+                    closure.add(next_state)
+                    stack.append(next_state)
+        return frozenset(closure)
+
+    def step(self, states, symbol):
+        # Return the DFA state reached from states on symbol
+        moves = self.cache.get(states)
+        if moves is not None:
+            self.cache.move_to_end(states)
+            next_states = moves.get(symbol)
+            if next_states is not None:
+                self.hits += 1
+                return next_states
+        self.misses += 1
+
+        successors = set()
+        index = self.index
+        for state in states:
+            successors.update(index.get(state, {}).get(symbol, ()))
+        next_states = self.closure(successors)
+
+        if self.cache_size > 0:
+            if moves is None:
+                if len(self.cache) >= self.cache_size:
+                    self.cache.popitem(last=False)
+                moves = self.cache[states] = {}
+            moves[symbol] = next_states
+        return next_states
+
+    def is_accepting(self, states):
+        return not self.accept_states.isdisjoint(states)
+
+    def accepts(self, string):
+        states = self.start
+        for symbol in string:
+            states = self.step(states, symbol)
+            if not states:
+                return False
+        return self.is_accepting(states)
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.cache_size, len(self.cache))
+
+    def cache_clear(self):
+        # Needed after the underlying NFA's transitions change
+        self.cache.clear()
+        self.hits = self.misses = 0
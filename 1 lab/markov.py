@@ -0,0 +1,152 @@
+import math
+
+import numpy as np
+
+EPSILON = 'ε'
+
+
+class MarkovGenerator:
+    """Generates many strings of a right-linear grammar at once.
+
+    A right-linear grammar is a Markov chain over its nonterminals: every
+    production emits terminals and then moves to at most one nonterminal.
+    Productions emitting several terminals are split into chains of internal
+    states so every step emits exactly one terminal (or ends the string). The
+    chain is stored as padded NumPy tables and thousands of derivations are
+    advanced in lockstep, writing terminals straight into a preallocated
+    code point matrix that is finally viewed as a NumPy string array.
+    """
+
+    def __init__(self, productions, terminals, start='S', weights=None):
+        weights = weights or {}
+        numbers = {symbol: number for number, symbol in enumerate(productions)}
+        if start not in numbers:
+            raise ValueError(f"Start symbol {start!r} has no productions")
+
+        choices = [[] for _ in numbers]   # state -> [(weight, terminal code point, next state)]
+        end = -1
+        for symbol, rules in productions.items():
+            rule_weights = weights.get(symbol, [1] * len(rules))
+            if len(rule_weights) != len(rules):
+                raise ValueError(f"Expected {len(rules)} weights for {symbol!r}, got {len(rule_weights)}")
+            for rule, weight in zip(rules, rule_weights):
+                if rule in ('', EPSILON):
+                    choices[numbers[symbol]].append((weight, 0, end))
+                    continue
+                target = end
+                if rule[-1] not in terminals:
+                    target = numbers.get(rule[-1])
+                    if target is None:
+                        raise ValueError(f"Nonterminal {rule[-1]!r} has no productions")
+                    rule = rule[:-1]
+                if not rule or any(char not in terminals for char in rule):
+                    raise ValueError(f"Production {symbol} -> {rule} is not right-linear with a terminal prefix")
+                # Every terminal after the first is emitted from a fresh internal state
+                state = numbers[symbol]
+                step_weight = weight
+                for char in rule[:-1]:
+                    choices.append([])
+                    choices[state].append((step_weight, ord(char), len(choices) - 1))
+                    state = len(choices) - 1
+                    step_weight = 1
+                choices[state].append((step_weight, ord(rule[-1]), target))
+
+        count = len(choices)
+        width = max(map(len, choices))
+        self.end = count
+        # Padding columns get a threshold above 1 so random draws never select them
+        self.thresholds = np.full((count, width), 2.0)
+        self.emitted = np.zeros((count, width), dtype=np.uint32)
+        self.targets = np.full((count, width), count, dtype=np.int64)
+        for state, options in enumerate(choices):
+            if not options:
+                raise ValueError("Every nonterminal needs at least one production")
+            total = float(sum(weight for weight, _, _ in options))
+            cumulative = 0.0
+            for column, (weight, code_point, target) in enumerate(options):
+                # thresholds[s, c] is the probability mass before choice c + 1
+                cumulative += weight / total
+                self.thresholds[state, column] = cumulative
+                self.emitted[state, column] = code_point
+                self.targets[state, column] = count if target == end else target
+            self.thresholds[state, len(options) - 1] = 1.0
+        self.start = numbers[start]
+        self.shortest_length = _shortest_length(choices, end)[self.start]
+
+    @classmethod
+    def from_grammar(cls, grammar, start='S'):
+        # Works with both Grammar classes of this lab (vn/vt/p and VN/VT/P)
+        productions = grammar.p if hasattr(grammar, 'p') else grammar.P
+        terminals = grammar.vt if hasattr(grammar, 'vt') else grammar.VT
+        return cls(productions, terminals, start, getattr(grammar, 'weights', None))
+
+    def generate_array(self, n, max_length=64, rng=None, batch_size=65536):
+        # Return a NumPy unicode array of n generated strings. Derivations that would
+        # exceed max_length terminals are thrown away and generated again.
+        # If no walk can finish within max_length the rejection loop below would not end
+        if self.shortest_length == math.inf:
+            raise ValueError("No derivation from the start symbol ever ends")
+        if self.shortest_length > max_length:
+            raise ValueError(f"Generated strings have at least {self.shortest_length} terminals, "
+                             f"more than max_length={max_length}")
+        rng = rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+        parts = []
+        missing = n
+        while missing > 0:
+            batch = self._generate_batch(min(batch_size, missing), max_length, rng)
+            parts.append(batch)
+            missing -= len(batch)
+        if not parts:
+            return np.zeros(0, dtype=f'<U{max_length or 1}')
+        return np.concatenate(parts)
+
+    def generate(self, n, max_length=64, rng=None, batch_size=65536):
+        # Same as generate_array, as a list of Python strings
+        return self.generate_array(n, max_length, rng, batch_size).tolist()
+
+    def _generate_batch(self, size, max_length, rng):
+        output = np.zeros((size, max(max_length, 1)), dtype=np.uint32)
+        finished = np.zeros(size, dtype=bool)
+        running = np.arange(size)
+        states = np.full(size, self.start, dtype=np.int64)
+
+        # Every step but the last one of a derivation emits one terminal, so all
+        # running walkers write to the same column
+        for step in range(max_length + 1):
+            if not running.size:
+                break
+            draws = rng.random(running.size)
+            columns = (draws[:, None] >= self.thresholds[states]).sum(axis=1)
+            emitted = self.emitted[states, columns]
+            targets = self.targets[states, columns]
+
+            if step == max_length:
+                # Only walkers ending here without emitting fit in the output
+                finished[running[(targets == self.end) & (emitted == 0)]] = True
+                break
+            output[running, step] = emitted
+            done = targets == self.end
+            finished[running[done]] = True
+            running = running[~done]
+            states = targets[~done]
+
+        width = output.shape[1]
+        return output[finished].view(f'<U{width}').ravel()
+
+
+def _shortest_length(choices, end):
+    # Fewest terminals emitted on a walk from each state to the end, relaxing every
+    # choice with positive weight until nothing changes (infinite if the end is unreachable)
+    shortest = [math.inf] * len(choices)
+    changed = True
+    while changed:
+        changed = False
+        for state, options in enumerate(choices):
+            for weight, code_point, target in options:
+                if weight <= 0:
+                    continue
+                length = (1 if code_point else 0) + (0 if target == end else shortest[target])
+                if length < shortest[state]:
+                    shortest[state] = length
+                    changed = True
+    return shortest
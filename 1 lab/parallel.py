@@ -0,0 +1,107 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from compiled_dfa import compiled
+
+# Automaton of the current worker process, installed once by the pool initializer
+_worker_dfa = None
+
+
+def _init_worker(automaton):
+    global _worker_dfa
+    _worker_dfa = compiled(automaton)
+
+
+def _accepts_chunk(strings):
+    return _worker_dfa.accepts_many(strings)
+
+
+def _text_mapping(chunk):
+    return _state_mapping(_worker_dfa, _worker_dfa.encode(chunk))
+
+
+def _bytes_mapping(chunk):
+    return _state_mapping(_worker_dfa, _worker_dfa.byte_lookup[np.frombuffer(chunk, dtype=np.uint8)])
+
+
+def _file_mapping(path, start, stop):
+    # Each worker maps the file itself, so only offsets cross the process boundary
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        data = np.frombuffer(mapped, dtype=np.uint8, count=stop - start, offset=start)
+        mapping = _state_mapping(_worker_dfa, _worker_dfa.byte_lookup[data])
+        del data
+    return mapping
+
+
+def _state_mapping(dfa, codes, block_size=4096):
+    # Run a chunk from every state at once and return the final state for each start.
+    # Runs that meet stay together from then on, so after deduplicating at every block
+    # the work quickly shrinks to a single run for most DFAs.
+    rows = dfa.rows
+    current = list(range(len(rows)))
+    for start in range(0, len(codes), block_size):
+        block = codes[start:start + block_size].tolist()
+        finals = {}
+        for state in set(current):
+            final = state
+            for code in block:
+                final = rows[final][code]
+            finals[state] = final
+        current = [finals[state] for state in current]
+    return current
+
+
+def accepts_parallel(automaton, strings, workers=None, chunk_size=65536):
+    # Split strings into chunks and check them in a process pool; returns a bool array
+    # in input order. Passing the path of a saved CompiledDFA lets every worker
+    # memory-map the same file instead of receiving a pickled copy.
+    if not isinstance(automaton, str):
+        automaton = compiled(automaton)
+    strings = strings if isinstance(strings, list) else list(strings)
+    chunks = [strings[start:start + chunk_size] for start in range(0, len(strings), chunk_size)]
+    if not chunks:
+        return np.zeros(0, dtype=bool)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(automaton,)) as pool:
+        return np.concatenate(list(pool.map(_accepts_chunk, chunks)))
+
+
+def run_speculative(automaton, data, workers=None, chunks=None):
+    # Return the state code reached after reading one large str or bytes-like input.
+    # The input is cut into chunks that workers run from every possible state; the
+    # resulting state -> state mappings are composed left to right.
+    dfa = compiled(automaton)
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or 4 * workers
+    size = -(-len(data) // chunks) or 1
+    pieces = [data[start:start + size] for start in range(0, len(data), size)]
+    task = _text_mapping if isinstance(data, str) else _bytes_mapping
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dfa,)) as pool:
+        return _compose(dfa, pool.map(task, pieces))
+
+
+def run_file_speculative(automaton, path, workers=None, chunks=None):
+    # Same as run_speculative for the bytes of a file; workers read their own byte ranges
+    dfa = compiled(automaton)
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or 4 * workers
+    length = os.path.getsize(path)
+    size = -(-length // chunks) or 1
+    starts = list(range(0, length, size))
+    stops = [min(start + size, length) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dfa,)) as pool:
+        return _compose(dfa, pool.map(_file_mapping, [path] * len(starts), starts, stops))
+
+
+def accepts_speculative(automaton, data, workers=None, chunks=None):
+    dfa = compiled(automaton)
+    return bool(dfa.accepting[run_speculative(dfa, data, workers, chunks)])
+
+
+def _compose(dfa, mappings):
+    state = dfa.start
+    for mapping in mappings:
+        state = mapping[state]
+    return state
@@ -0,0 +1,86 @@
+from compiled_dfa import CompiledDFA, compiled
+
+
+class ProductAutomaton:
+    """Runs several automata in one pass by stepping through their product.
+
+    A product state is the tuple of the component states; it is numbered and
+    its transitions are computed the first time an input reaches it, so only
+    the reachable part of the product is ever built. accept receives the
+    tuple of component acceptance flags and decides whether the product state
+    accepts. Symbols outside the product alphabet are rejected.
+    """
+
+    def __init__(self, automata, accept, alphabet=None):
+        self.automata = [compiled(automaton) for automaton in automata]
+        self.accept = accept
+        if alphabet is None:
+            alphabet = set().union(*(dfa.alphabet for dfa in self.automata))
+        self.alphabet = sorted(alphabet)
+        self._symbols = frozenset(self.alphabet)
+        self._components = [(dfa.rows, dfa.symbol_codes, dfa.unknown, dfa.accepting.tolist())
+                            for dfa in self.automata]
+
+        self.states = []       # Product state number -> tuple of component states
+        self.numbers = {}      # Tuple of component states -> product state number
+        self.moves = []        # Product state number -> {symbol: next product state number}
+        self.accepting = []    # Product state number -> bool
+        self.start = self._intern(tuple(dfa.start for dfa in self.automata))
+
+    def _intern(self, components):
+        number = self.numbers.get(components)
+        if number is None:
+            number = self.numbers[components] = len(self.states)
+            self.states.append(components)
+            self.moves.append({})
+            flags = tuple(accepting[state] for (_, _, _, accepting), state in zip(self._components, components))
+            self.accepting.append(bool(self.accept(flags)))
+        return number
+
+    def step(self, state, symbol):
+        # Return the next product state number, or None for a symbol outside the alphabet
+        next_state = self.moves[state].get(symbol)
+        if next_state is None:
+            if symbol not in self._symbols:
+                return None
+            components = tuple(rows[current][codes.get(symbol, unknown)]
+                               for (rows, codes, unknown, _), current in zip(self._components, self.states[state]))
+            next_state = self.moves[state][symbol] = self._intern(components)
+        return next_state
+
+    def accepts(self, string):
+        state = self.start
+        for symbol in string:
+            state = self.step(state, symbol)
+            if state is None:
+                return False
+        return self.accepting[state]
+
+    def compile(self):
+        # Build every reachable product state and return the table form of the product
+        transitions = []
+        state = 0
+        while state < len(self.states):
+            for symbol in self.alphabet:
+                transitions.append((state, symbol, self.step(state, symbol)))
+            state += 1
+        accept_states = {number for number, accepting in enumerate(self.accepting) if accepting}
+        return CompiledDFA.from_transitions(transitions, self.start, accept_states, self.alphabet)
+
+
+def intersection(*automata):
+    return ProductAutomaton(automata, all)
+
+
+def union(*automata):
+    return ProductAutomaton(automata, any)
+
+
+def difference(a, b):
+    # Strings accepted by a but not by b
+    return ProductAutomaton((a, b), lambda flags: flags[0] and not flags[1])
+
+
+def complement(a, alphabet=None):
+    # Strings over alphabet (a's own alphabet by default) that a rejects
+    return ProductAutomaton((a,), lambda flags: not flags[0], alphabet)
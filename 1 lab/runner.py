@@ -0,0 +1,102 @@
+import mmap
+
+import numpy as np
+
+from compiled_dfa import compiled
+
+
+class AutomatonRunner:
+    """Runs a compiled DFA over input that arrives in successive chunks.
+
+    Chunks may be str, or bytes-like objects whose bytes are matched against
+    the single-byte (ASCII/Latin-1) symbols of the alphabet.
+    """
+
+    def __init__(self, automaton):
+        self.dfa = compiled(automaton)
+        self.state = self.dfa.start
+
+    def feed(self, chunk):
+        if isinstance(chunk, str):
+            self.state = self.dfa.run(chunk, self.state)
+        else:
+            rows = self.dfa.rows
+            state = self.state
+            for code in self.dfa.byte_lookup[np.frombuffer(chunk, dtype=np.uint8)].tolist():
+                state = rows[state][code]
+            self.state = state
+        return self
+
+    def is_accepting(self):
+        return bool(self.dfa.accepting[self.state])
+
+    def is_dead(self):
+        # Once in the dead state no further input can lead to acceptance
+        return self.state == self.dfa.dead
+
+    def reset(self):
+        self.state = self.dfa.start
+
+
+def scan_buffer(automaton, buffer, separator=b'\n', block_size=1 << 22):
+    # Yield True/False for every separator-terminated record of a bytes-like
+    # buffer (bytes, memoryview, mmap). The buffer is viewed in place, never copied.
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    blocks = (data[start:start + block_size] for start in range(0, len(data), block_size))
+    return _scan_blocks(compiled(automaton), blocks, separator)
+
+
+def scan_file(automaton, file, separator=b'\n', block_size=1 << 22):
+    # Yield True/False for every record of a file (path or binary file object),
+    # reading it in fixed-size blocks so memory stays flat for any file size
+    dfa = compiled(automaton)
+    if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+        with open(file, 'rb') as opened:
+            yield from _scan_blocks(dfa, _read_blocks(opened, block_size), separator)
+    else:
+        yield from _scan_blocks(dfa, _read_blocks(file, block_size), separator)
+
+
+def scan_mmap(automaton, path, separator=b'\n', block_size=1 << 22):
+    # Like scan_file, but lets the OS page the file in through a read-only mapping
+    dfa = compiled(automaton)
+    with open(path, 'rb') as opened:
+        if not opened.seek(0, 2):
+            return
+        with mmap.mmap(opened.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from scan_buffer(dfa, mapped, separator, block_size)
+
+
+def _read_blocks(file, block_size):
+    while True:
+        block = file.read(block_size)
+        if not block:
+            return
+        yield np.frombuffer(block, dtype=np.uint8)
+
+
+def _scan_blocks(dfa, blocks, separator):
+    # Records are split on separator positions and run together with
+    # CompiledDFA.run_encoded; the record left open at the end of a block carries
+    # its state into the first record of the next one.
+    separator = ord(separator)
+    carry = dfa.start
+    pending = False
+    for block in blocks:
+        ends = np.flatnonzero(block == separator)
+        starts = np.empty(len(ends) + 1, dtype=np.int64)
+        starts[0] = 0
+        starts[1:] = ends + 1
+        lengths = np.append(ends, len(block)) - starts
+
+        states = np.full(len(starts), dfa.start, dtype=np.uint32)
+        states[0] = carry
+        final = dfa.run_encoded(dfa.byte_lookup[block], starts, lengths, states)
+        if len(ends):
+            yield from dfa.accepting[final[:-1]].tolist()
+            pending = False
+        carry = final[-1]
+        pending = pending or lengths[-1] > 0
+
+    if pending:
+        yield bool(dfa.accepting[carry])
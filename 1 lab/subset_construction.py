@@ -0,0 +1,153 @@
+from collections import deque, namedtuple
+
+EPSILON = 'ε'
+
+# masks[i] is the bitset of NFA states forming DFA state i (the start state is 0),
+# transitions holds (i, symbol, j) triples and accepting the accepting DFA state numbers
+Subsets = namedtuple('Subsets', ['nfa_states', 'masks', 'transitions', 'accepting'])
+
+
+def subset_construction(index, start, accept_states, symbols):
+    """Determinize an NFA given as a state -> symbol -> next states index.
+
+    NFA states are numbered once and sets of them are Python-int bitsets.
+    Epsilon closures and the closed successor set of every state on every
+    symbol are computed up front, so building a DFA state costs one OR per
+    member state and symbol. The empty (dead) subset is never emitted.
+    """
+    nfa_states = [start]
+    number = {start: 0}
+
+    def intern(state):
+        if state not in number:
+            number[state] = len(nfa_states)
+            nfa_states.append(state)
+        return number[state]
+
+    for state, moves in index.items():
+        intern(state)
+        for next_states in moves.values():
+            for next_state in next_states:
+                intern(next_state)
+
+    epsilon_edges = [[] for _ in nfa_states]
+    for state, moves in index.items():
+        epsilon_edges[number[state]] = [number[next_state] for next_state in moves.get(EPSILON, ())]
+    closures = _epsilon_closures(epsilon_edges)
+
+    # successors[symbol][i] is the ε-closed set of states reachable from NFA state i on symbol
+    symbols = sorted(symbol for symbol in symbols if symbol != EPSILON)
+    successors = {symbol: {} for symbol in symbols}
+    for state, moves in index.items():
+        for symbol, next_states in moves.items():
+            if symbol in successors:
+                mask = 0
+                for next_state in next_states:
+                    mask |= closures[number[next_state]]
+                successors[symbol][number[state]] = mask
+
+    accept_mask = 0
+    for state in accept_states:
+        if state in number:
+            accept_mask |= 1 << number[state]
+
+    masks = [closures[0]]
+    dfa_number = {closures[0]: 0}
+    transitions = []
+    accepting = set()
+    worklist = deque([0])
+    while worklist:
+        current = worklist.popleft()
+        mask = masks[current]
+        if mask & accept_mask:
+            accepting.add(current)
+        members = _bits(mask)
+        for symbol in symbols:
+            table = successors[symbol]
+            target = 0
+            for member in members:
+                target |= table.get(member, 0)
+            if not target:
+                continue
+            if target not in dfa_number:
+                dfa_number[target] = len(masks)
+                masks.append(target)
+                worklist.append(dfa_number[target])
+            transitions.append((current, symbol, dfa_number[target]))
+
+    return Subsets(nfa_states, masks, transitions, accepting)
+
+
+def decode(mask, nfa_states):
+    # Turn a bitset back into the frozenset of NFA states it stands for
+    return frozenset(nfa_states[member] for member in _bits(mask))
+
+
+def _bits(mask):
+    members = []
+    while mask:
+        low = mask & -mask
+        members.append(low.bit_length() - 1)
+        mask ^= low
+    return members
+
+
+def _epsilon_closures(epsilon_edges):
+    # Iterative Tarjan SCC over the ε-graph. Components are completed in reverse
+    # topological order, so every component an ε-edge leads out to is already closed.
+    count = len(epsilon_edges)
+    closures = [1 << state for state in range(count)]
+    if not any(epsilon_edges):
+        return closures
+
+    order = [-1] * count
+    low = [0] * count
+    on_stack = [False] * count
+    stack = []
+    counter = 0
+    for root in range(count):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            node, position = work[-1]
+            edges = epsilon_edges[node]
+            if position < len(edges):
+                work[-1] = (node, position + 1)
+                target = edges[position]
+                if order[target] == -1:
+                    order[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = True
+                    work.append((target, 0))
+                elif on_stack[target]:
+                    low[node] = min(low[node], order[target])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] != order[node]:
+                continue
+
+            members = []
+            while True:
+                member = stack.pop()
+                on_stack[member] = False
+                members.append(member)
+                if member == node:
+                    break
+            mask = 0
+            for member in members:
+                mask |= 1 << member
+                for target in epsilon_edges[member]:
+                    mask |= closures[target]
+            for member in members:
+                closures[member] = mask
+    return closures
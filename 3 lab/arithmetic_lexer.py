@@ -1,5 +1,9 @@
 from enum import Enum
-from typing import List
+from itertools import chain
+from typing import Iterable, Iterator, List, TextIO, Tuple
+
+from lexer_generator import TokenScanner
+from token_buffer import TokenBuffer
 
 # Enum defining different types of tokens
 class TokenType(Enum):
@@ -12,6 +16,8 @@ class TokenType(Enum):
 
 # Class representing a token with its type, value, and position in the input string
 class Token:
+    __slots__ = ('type', 'value', 'position')
+
     def __init__(self, type: TokenType, value: str, position: int):
         self.type = type
         self.value = value
@@ -20,75 +26,163 @@ class Token:
     def __str__(self):
         return f"[{self.type}: {self.value}, position: {self.position}]"
 
+# Error token whose message is only formatted when it is read
+class ErrorToken(Token):
+    __slots__ = ('detail',)
+
+    def __init__(self, detail: str, position: int):
+        self.type = TokenType.ERROR
+        self.detail = detail
+        self.position = position
+
+    @property
+    def value(self) -> str:
+        return f"Invalid expression: {self.detail} at position {self.position}."
+
 # Class responsible for lexing arithmetic expressions, breaking them down into tokens
 class ArithmeticLexer:
-    def __init__(self, ignore_whitespace: bool = False):
+    # Token rules in priority order, compiled once into a shared master pattern
+    token_specification = [
+        (TokenType.NUMBER, r'\d+'),
+        (TokenType.OPERATOR, r'[+\-*/]'),
+        (TokenType.LEFT_P, r'\('),
+        (TokenType.RIGHT_P, r'\)'),
+        (TokenType.SPACE, r'\s+'),
+    ]
+    _scanners = {}  # ignore_whitespace -> scanner
+
+    def __init__(self, ignore_whitespace: bool = True):
+        # Whitespace only separates tokens; pass ignore_whitespace=False to also
+        # receive it as SPACE tokens
         self.ignore_whitespace = ignore_whitespace
 
+    @classmethod
+    def scanner(cls, ignore_whitespace: bool = True) -> TokenScanner:
+        scanner = cls._scanners.get(ignore_whitespace)
+        if scanner is None:
+            skip = {TokenType.SPACE} if ignore_whitespace else ()
+            scanner = cls._scanners[ignore_whitespace] = TokenScanner(cls.token_specification, skip)
+        return scanner
+
     def tokenize(self, input: str) -> List[Token]:
+        # Same checks as _lex, written as one loop over the master pattern's matches
+        # because this is the hot path for whole expressions
+        scanner = self.scanner(self.ignore_whitespace)
+        group_kinds = scanner.group_kinds
+        left_p, right_p = TokenType.LEFT_P, TokenType.RIGHT_P
         tokens = []  # List to store tokens
-        current_token = ''  # String to build the current token
-        current_position = 0  # Current position in the input string
-        left_paren_count = 0  # Count of left parentheses
-        right_paren_count = 0  # Count of right parentheses
-
-        # Iterate through each character in the input string
-        for c in input:
-            if c.isspace():
-                # If whitespace should be ignored, skip to the next character
-                if self.ignore_whitespace:
-                    current_position += 1
-                    continue
-            elif c in ['+', '-', '*', '/']:
-                # Add the current token (number or operator)
-                if current_token:
-                    tokens.append(self.create_token(current_token, current_position))
-                    current_token = ''
-                tokens.append(Token(TokenType.OPERATOR, c, current_position))
-            elif c.isdigit():
-                # Append the digit to the current token
-                current_token += c
-            elif c == '(':
-                # Add the current token (number or operator)
-                if current_token:
-                    tokens.append(self.create_token(current_token, current_position))
-                    current_token = ''
-                tokens.append(Token(TokenType.LEFT_P, c, current_position))
-                left_paren_count += 1
-            elif c == ')':
-                # Add the current token (number or operator)
-                if current_token:
-                    tokens.append(self.create_token(current_token, current_position))
-                    current_token = ''
-                right_paren_count += 1
-                # Check if there are more right parentheses than left parentheses
-                if right_paren_count > left_paren_count:
-                    return self.invalid_token_error(c, current_position)
-                tokens.append(Token(TokenType.RIGHT_P, c, current_position))
-            else:
-                return self.invalid_token_error(c, current_position)
-            current_position += 1  # Move to the next position in the input string
+        append = tokens.append
+        match = None
+        paren_depth = 0  # Open left parentheses not yet closed
 
-        # Add the last token (number or operator)
-        if current_token:
-            tokens.append(self.create_token(current_token, current_position))
+        # Matches follow each other without gaps and stop where no token starts
+        for match in iter(scanner.pattern.scanner(input).match, None):
+            index = match.lastindex
+            kind = group_kinds[index]
+            if kind is left_p:
+                paren_depth += 1
+            elif kind is right_p:
+                paren_depth -= 1
+                # Check if there are more right parentheses than left parentheses
+                if paren_depth < 0:
+                    return [ErrorToken(')', match.start(index))]
+            append(Token(kind, match.group(index), match.start(index)))
 
+        position = scanner.skip(input, match.end() if match else 0)
+        if position != len(input):
+            # No rule matches the character at position
+            return [ErrorToken(input[position], position)]
         # Check if the number of left parentheses matches the number of right parentheses
-        if left_paren_count != right_paren_count:
-            return self.invalid_token_error("Mismatched parentheses", len(input))
-
+        if paren_depth:
+            return [ErrorToken("Mismatched parentheses", len(input))]
         return tokens  # Return the list of tokens
 
-    # Method to create a token from the provided string and position
-    def create_token(self, token_string, position):
-        if token_string.isdigit():
-            return Token(TokenType.NUMBER, token_string, position)
-        else:
-            return Token(TokenType.ERROR, f"Invalid expression: {token_string} at position {position}.", position)
+    def tokenize_buffer(self, input: str) -> TokenBuffer:
+        # Tokenize into column storage; values and Token objects are created only
+        # when an entry is read
+        buffer = TokenBuffer(input, TokenType, self._token)
+        for kind, _, start, end, offset in self._lex((input,)):
+            if kind is TokenType.ERROR:
+                buffer.clear()
+            buffer.append(kind, offset + start, offset + end)
+        return buffer
+
+    def tokenize_bytes(self, data) -> TokenBuffer:
+        # Tokenize ASCII input held in bytes, an mmap or a memoryview without decoding
+        # or copying it. Entries are offsets into data, which the buffer keeps a view of,
+        # so release the buffer before closing an mmap; buffer.integer(i) parses a
+        # number on demand
+        view = memoryview(data)
+        buffer = TokenBuffer(view, TokenType, self._byte_token)
+        for kind, _, start, end, offset in self._lex((view,), bytes_mode=True):
+            if kind is TokenType.ERROR:
+                buffer.clear()
+            buffer.append(kind, offset + start, offset + end)
+        return buffer
+
+    def tokenize_iter(self, stream: TextIO, chunk_size: int = 1 << 16) -> Iterator[Token]:
+        # Lazily yield tokens from a text stream (a file, sys.stdin, io.StringIO) read
+        # chunk_size characters at a time, so memory does not grow with the input.
+        # Tokens already yielded cannot be withdrawn, so an error ends the stream
+        # with an error token instead of replacing the whole result
+        return (self._token(*match) for match in self._lex(iter(lambda: stream.read(chunk_size), '')))
+
+    def _lex(self, chunks: Iterable, bytes_mode: bool = False) -> Iterator[Tuple[TokenType, str, int, int, int]]:
+        # Yield (type, text, start, end, offset) for each token: text[start:end] is its
+        # value and offset + start its position in the whole input. The last entry
+        # has type ERROR if the input is invalid. In bytes mode the chunks are
+        # bytes-like and text is one of them
+        scanner = self.scanner(self.ignore_whitespace)
+        scan = scanner.scan_bytes if bytes_mode else scanner.scan
+        pending = None  # Unfinished token carried over from the previous chunk
+        offset = 0  # Absolute position of pending[0] in the input
+        paren_depth = 0  # Open left parentheses not yet closed
+
+        for chunk in chain(chunks, (None,)):
+            final = chunk is None
+            if final:
+                if not pending:
+                    break
+                text = pending
+            else:
+                text = pending + chunk if pending else chunk
+            consumed = 0
+            # Each match is a (type, start, end) slice of the text
+            for kind, start, end in scan(text, final=final):
+                consumed = end
+                if kind is None:
+                    yield TokenType.ERROR, text, start, end, offset
+                    return
+                if kind is TokenType.LEFT_P:
+                    paren_depth += 1
+                elif kind is TokenType.RIGHT_P:
+                    paren_depth -= 1
+                    # Check if there are more right parentheses than left parentheses
+                    if paren_depth < 0:
+                        yield TokenType.ERROR, text, start, end, offset
+                        return
+                yield kind, text, start, end, offset
+            pending = text[consumed:]
+            offset += consumed
+
+        # Check if the number of left parentheses matches the number of right parentheses
+        # (reported as an empty error slice at the end of the input)
+        if paren_depth:
+            pending = pending or ''
+            yield TokenType.ERROR, pending, len(pending), len(pending), offset
+
+    # Method to create a token from a slice of the input
+    def _token(self, kind, text, start, end, offset=0):
+        if kind is TokenType.ERROR:
+            return ErrorToken(text[start:end] or "Mismatched parentheses", offset + start)
+        return Token(kind, text[start:end], offset + start)
 
-    # Method to create an error token with the provided message and position
-    def invalid_token_error(self, token, position):
-        return [Token(TokenType.ERROR, f"Invalid expression: {token} at position {position}.", position)]
+    # Method to create a token from a slice of bytes-like input
+    def _byte_token(self, kind, data, start, end, offset=0):
+        value = bytes(data[start:end]).decode('latin-1')
+        if kind is TokenType.ERROR:
+            return ErrorToken(value or "Mismatched parentheses", offset + start)
+        return Token(kind, value, offset + start)
 
 # Example usage
 lexer = ArithmeticLexer()
@@ -0,0 +1,118 @@
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import timeit
+
+# Times the lexers on one long expression against the hand-written loops they replaced:
+# the character-by-character if/elif loop of ArithmeticLexer and the per-call
+# re.finditer master pattern of the lab 6 Lexer
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from arithmetic_lexer import ArithmeticLexer, ErrorToken, Token, TokenType
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '6 lab'))
+import main as lab6
+
+
+def baseline_arithmetic_tokenize(input):
+    # The original ArithmeticLexer.tokenize with whitespace ignored
+    tokens = []
+    current_token = ''
+    current_position = 0
+    left_paren_count = 0
+    right_paren_count = 0
+    for c in input:
+        if c.isspace():
+            current_position += 1
+            continue
+        elif c in ['+', '-', '*', '/']:
+            if current_token:
+                tokens.append(Token(TokenType.NUMBER, current_token, current_position))
+                current_token = ''
+            tokens.append(Token(TokenType.OPERATOR, c, current_position))
+        elif c.isdigit():
+            current_token += c
+        elif c == '(':
+            if current_token:
+                tokens.append(Token(TokenType.NUMBER, current_token, current_position))
+                current_token = ''
+            tokens.append(Token(TokenType.LEFT_P, c, current_position))
+            left_paren_count += 1
+        elif c == ')':
+            if current_token:
+                tokens.append(Token(TokenType.NUMBER, current_token, current_position))
+                current_token = ''
+            right_paren_count += 1
+            if right_paren_count > left_paren_count:
+                return [ErrorToken(c, current_position)]
+            tokens.append(Token(TokenType.RIGHT_P, c, current_position))
+        else:
+            return [ErrorToken(c, current_position)]
+        current_position += 1
+    if current_token:
+        tokens.append(Token(TokenType.NUMBER, current_token, current_position))
+    if left_paren_count != right_paren_count:
+        return [ErrorToken("Mismatched parentheses", len(input))]
+    return tokens
+
+
+def baseline_lab6_tokenize(text):
+    # The original lab 6 Lexer.tokenize, which joined and compiled its pattern per call
+    token_regex = '|'.join(f'(?P<{tok.name}>{pattern})' for tok, pattern in [
+        (lab6.TokenType.INTEGER, r'\d+'),
+        (lab6.TokenType.PLUS, r'\+'),
+        (lab6.TokenType.MINUS, r'\-'),
+        (lab6.TokenType.TIMES, r'\*'),
+        (lab6.TokenType.DIVIDE, r'\/'),
+        (lab6.TokenType.LPAREN, r'\('),
+        (lab6.TokenType.RPAREN, r'\)'),
+        (lab6.TokenType.EOF, r'\Z'),
+    ])
+    tokens = []
+    for mo in re.finditer(token_regex, text):
+        tok_type = lab6.TokenType[mo.lastgroup]
+        value = mo.group()
+        if tok_type == lab6.TokenType.INTEGER:
+            value = int(value)
+        tokens.append(lab6.Token(tok_type, value))
+    tokens.append(lab6.Token(lab6.TokenType.EOF, None))
+    return tokens
+
+
+def expression(length, seed=1):
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < length:
+        part = f"({rng.randint(0, 999)} + {rng.randint(0, 99)}) * {rng.randint(1, 9)} - "
+        parts.append(part)
+        size += len(part)
+    return ''.join(parts) + '1'
+
+
+def best(function, number=5, repeat=9):
+    # Best time of one call in milliseconds
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1000
+
+
+def lab6_tokenize(text):
+    lexer = lab6.Lexer(text)
+    lexer.tokenize()
+    return lexer.tokens
+
+
+if __name__ == '__main__':
+    text = expression(42000)
+    lexer = ArithmeticLexer()
+    assert [(t.type, t.value) for t in lexer.tokenize(text)] == \
+        [(t.type, t.value) for t in baseline_arithmetic_tokenize(text)]
+
+    print(f"Expression of {len(text)} characters")
+    print(f"ArithmeticLexer baseline loop  {best(lambda: baseline_arithmetic_tokenize(text)):7.2f} ms")
+    print(f"ArithmeticLexer.tokenize       {best(lambda: lexer.tokenize(text)):7.2f} ms")
+    print(f"ArithmeticLexer.tokenize_bytes {best(lambda: lexer.tokenize_bytes(text.encode())):7.2f} ms")
+    print(f"lab 6 baseline re.finditer     {best(lambda: baseline_lab6_tokenize(text)):7.2f} ms")
+    print(f"lab 6 Lexer.tokenize           {best(lambda: lab6_tokenize(text)):7.2f} ms")
@@ -0,0 +1,117 @@
+import re
+import sys
+
+# Builds a scanner from a token specification: a list of (kind, pattern) pairs in
+# priority order, with patterns in Python re syntax (\d, \s and \w match ASCII only).
+# A pattern that is exactly \Z matches once at the end of the input.
+# All rules are joined into one master pattern, compiled once, in which every rule
+# is a named group; at each position the first rule that matches wins, as in an re
+# alternation, and the group that matched names the token kind. Rules whose kinds are
+# listed in skip are consumed in front of every token and never reported, so they
+# must not match where another rule starts.
+
+_END_OF_INPUT = r'\Z'
+
+
+class TokenScanner:
+    """Scans text with one precompiled master pattern built from a token specification.
+
+    The per-character work happens inside the re engine, and Python code only
+    runs once per reported token: skipped text is matched together with the
+    token that follows it. Matches are reported as (kind, start, end) offsets
+    and never copy text.
+    """
+
+    def __init__(self, specification, skip=(), flags=re.ASCII):
+        self.flags = flags
+        self.kinds = []
+        self.end_kind = None
+        rules = []
+        skipped = []
+        for kind, pattern in specification:
+            if pattern == _END_OF_INPUT:
+                self.end_kind = kind
+                continue
+            if re.compile(pattern, flags).fullmatch(''):
+                raise ValueError(f"Pattern {pattern!r} for {kind} matches the empty string")
+            if kind in skip:
+                skipped.append(f'(?:{pattern})')
+            else:
+                rules.append(f'(?P<_{len(self.kinds)}>{pattern})')
+                self.kinds.append(kind)
+
+        # (?!) never matches, so a specification without rules matches nothing
+        self.source = '|'.join(rules) or '(?!)'
+        self.skip_source = None
+        if skipped:
+            # The skipped run is matched atomically, so a failed token after a long run
+            # is not retried on every shorter split of it: with a possessive repeat
+            # where re supports it (3.11), otherwise with a lookahead and backreference
+            self.skip_source = f"(?:{'|'.join(skipped)})*"
+            if sys.version_info >= (3, 11):
+                self.source = f'{self.skip_source}+(?:{self.source})'
+            else:
+                self.source = f'(?=(?P<_skip>{self.skip_source}))(?P=_skip)(?:{self.source})'
+        self.pattern = re.compile(self.source, flags)
+        self.skip_pattern = re.compile(self.skip_source, flags) if skipped else None
+        self._byte_patterns = None
+
+        # match.lastindex is the group of the whole rule, since it closes after any
+        # groups inside it and after the skipped text
+        self.group_kinds = [None] * (self.pattern.groups + 1)
+        for name, number in self.pattern.groupindex.items():
+            if name[1:].isdigit():
+                self.group_kinds[number] = self.kinds[int(name[1:])]
+
+    @property
+    def byte_patterns(self):
+        # The master and skip patterns compiled for bytes-like input (bytes, mmap,
+        # memoryview); characters of the patterns are taken as Latin-1 bytes
+        if self._byte_patterns is None:
+            self._byte_patterns = (
+                re.compile(self.source.encode('latin-1'), self.flags),
+                re.compile(self.skip_source.encode('latin-1'), self.flags) if self.skip_source else None,
+            )
+        return self._byte_patterns
+
+    def skip(self, text, position):
+        # Position after the skipped text starting at position
+        if self.skip_pattern is None:
+            return position
+        return self.skip_pattern.match(text, position).end()
+
+    def scan(self, text, start=0, final=True):
+        # Yield (kind, start, end) for each token of text; kind is None for a character
+        # no rule matches, which is reported one character at a time. With final=False
+        # text is only a prefix of the input: scanning stops before a token or an
+        # unmatched last character that reaches the end of text, since more input
+        # could still change it, so the caller can resume from the last end offset
+        return self._scan(self.pattern, self.skip_pattern, text, start, final)
+
+    def scan_bytes(self, data, start=0, final=True):
+        # scan() for bytes, bytearray, mmap or memoryview input, which the bytes
+        # patterns read directly, so nothing is decoded or copied
+        pattern, skip_pattern = self.byte_patterns
+        return self._scan(pattern, skip_pattern, data, start, final)
+
+    def _scan(self, pattern, skip_pattern, text, start, final):
+        group_kinds = self.group_kinds
+        length = len(text)
+        position = start
+        while True:
+            # Pattern.scanner matches back to back from position and stops at the
+            # first place where no token starts
+            for match in iter(pattern.scanner(text, position).match, None):
+                index = match.lastindex
+                begin, position = match.span(index)
+                if position == length and not final:
+                    return
+                yield group_kinds[index], begin, position
+            if skip_pattern is not None:
+                position = skip_pattern.match(text, position).end()
+            if position >= length or (position + 1 == length and not final):
+                break
+            yield None, position, position + 1
+            position += 1
+        if self.end_kind is not None and final:
+            yield self.end_kind, length, length
@@ -15,3 +15,16 @@ for expression in expressions:
     for token in tokens:
         print(token)
     print()
+
+# Regression check for the scanner: optional prefixes must match
+from lexer_generator import TokenScanner
+
+scanner_cases = [
+    ([('X', r'a?b')], "aab", [(None, 0, 1), ('X', 1, 3)]),
+    ([('X', r'(c)?b')], "cb", [('X', 0, 2)]),
+    ([('NUMBER', r'-?\d+')], "-12", [('NUMBER', 0, 3)]),
+]
+for specification, text, expected in scanner_cases:
+    matches = list(TokenScanner(specification).scan(text))
+    assert matches == expected, f"{specification} on {text!r}: {matches} != {expected}"
+print("Scanner checks passed")
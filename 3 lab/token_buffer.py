@@ -0,0 +1,65 @@
+from array import array
+
+
+class TokenBuffer:
+    """Stores the tokens of one text column by column.
+
+    Each token costs one byte for its kind and four bytes each for its start
+    and end offsets (eight for texts of 4 GiB or more), kept in parallel
+    arrays, instead of a Python object with its own value string. Values and
+    token objects are only materialized when they are read, by
+    make_token(kind, text, start, end).
+    """
+
+    def __init__(self, text, kinds, make_token):
+        if len(kinds) > 256:
+            raise ValueError("A token buffer holds at most 256 token kinds")
+        self.text = text
+        self.kinds = list(kinds)  # Kind code -> token type
+        self.codes = {kind: code for code, kind in enumerate(self.kinds)}
+        self.make_token = make_token
+        self.kind_codes = array('B')
+        # Offsets up to len(text) must fit; 'I' is 32 bits on common platforms
+        offset_type = 'I' if len(text) < 1 << (8 * array('I').itemsize) else 'Q'
+        self.starts = array(offset_type)
+        self.ends = array(offset_type)
+
+    def append(self, kind, start, end):
+        self.kind_codes.append(self.codes[kind])
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def clear(self):
+        del self.kind_codes[:], self.starts[:], self.ends[:]
+
+    def __len__(self):
+        return len(self.kind_codes)
+
+    def kind(self, index):
+        return self.kinds[self.kind_codes[index]]
+
+    def value(self, index):
+        # The source text of a token, sliced only on request
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def integer(self, index):
+        # Decimal value of a digits-only token; bytes-like text is parsed in place
+        # rather than sliced into a new object
+        start, end = self.starts[index], self.ends[index]
+        if isinstance(self.text, str):
+            return int(self.text[start:end])
+        value = 0
+        for byte in memoryview(self.text)[start:end]:
+            value = value * 10 + byte - 48
+        return value
+
+    def __getitem__(self, index):
+        return self.make_token(self.kinds[self.kind_codes[index]], self.text,
+                               self.starts[index], self.ends[index])
+
+    def __iter__(self):
+        kinds = self.kinds
+        make_token = self.make_token
+        text = self.text
+        for code, start, end in zip(self.kind_codes, self.starts, self.ends):
+            yield make_token(kinds[code], text, start, end)
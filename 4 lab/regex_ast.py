@@ -0,0 +1,115 @@
+from functools import lru_cache
+
+# Syntax tree of the lab's regular expression dialect:
+#   - letters and digits match themselves
+#   - (x|y|...) groups alternatives, each of which may be any sub-expression
+#   - a postfix ^N (a single digit) repeats the previous atom exactly N times
+#   - postfix *, + and ? mean zero or more, one or more and zero or one times
+
+
+class Node:
+    pass
+
+
+class Literal(Node):
+    def __init__(self, char):
+        self.char = char
+
+    def __repr__(self):
+        return f'Literal({self.char!r})'
+
+
+class Concat(Node):
+    def __init__(self, items):
+        self.items = items
+
+    def __repr__(self):
+        return f'Concat({self.items!r})'
+
+
+class Alternation(Node):
+    def __init__(self, options):
+        self.options = options
+
+    def __repr__(self):
+        return f'Alternation({self.options!r})'
+
+
+class Repeat(Node):
+    # Repeats node between low and high times; high is None when unbounded
+    def __init__(self, node, low, high):
+        self.node = node
+        self.low = low
+        self.high = high
+
+    def __repr__(self):
+        return f'Repeat({self.node!r}, {self.low}, {self.high})'
+
+
+@lru_cache(maxsize=None)
+def parse(pattern):
+    # Parse pattern into a tree; results are cached by pattern text, so trees are shared
+    # and must not be modified
+    parser = _Parser(pattern)
+    node = parser.alternation()
+    if parser.pos != len(pattern):
+        parser.error(f"Unexpected {pattern[parser.pos]!r}")
+    return node
+
+
+class _Parser:
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.pos = 0
+
+    def error(self, message):
+        raise ValueError(f"{message} at position {self.pos} in {self.pattern!r}")
+
+    def peek(self):
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def alternation(self):
+        options = [self.sequence()]
+        while self.peek() == '|':
+            self.pos += 1
+            options.append(self.sequence())
+        return options[0] if len(options) == 1 else Alternation(options)
+
+    def sequence(self):
+        items = []
+        while self.peek() is not None and self.peek() not in '|)':
+            items.append(self.postfix())
+        return items[0] if len(items) == 1 else Concat(items)
+
+    def postfix(self):
+        node = self.atom()
+        while self.peek() is not None and self.peek() in '^*+?':
+            operator = self.peek()
+            self.pos += 1
+            if operator == '^':
+                count = self.peek()
+                if count is None or not count.isdigit():
+                    self.error("Expected a digit after '^'")
+                self.pos += 1
+                node = Repeat(node, int(count), int(count))
+            elif operator == '*':
+                node = Repeat(node, 0, None)
+            elif operator == '+':
+                node = Repeat(node, 1, None)
+            else:
+                node = Repeat(node, 0, 1)
+        return node
+
+    def atom(self):
+        char = self.peek()
+        if char == '(':
+            self.pos += 1
+            node = self.alternation()
+            if self.peek() != ')':
+                self.error("Expected ')'")
+            self.pos += 1
+            return node
+        if char is not None and char.isalnum():
+            self.pos += 1
+            return Literal(char)
+        self.error(f"Unexpected {char!r}" if char is not None else "Unexpected end of pattern")
@@ -0,0 +1,144 @@
+from itertools import chain
+
+from regex_ast import Alternation, Concat, Literal, Repeat, parse
+
+
+class RegexEnumerator:
+    """Enumerates every string a pattern of the lab's regex dialect can produce.
+
+    Unbounded * and + repetitions are cut at repeat_cap, so the set is finite.
+    Strings come out in a fixed order: alternatives in pattern order, fewer
+    repetitions first, and within a concatenation the last part varies
+    fastest, as with itertools.product. count() and nth(k) follow the same
+    order combinatorially without producing the strings before k, so index
+    ranges can be handed to different workers. Every derivation is listed,
+    so an ambiguous pattern such as (a|a) yields a string more than once.
+    """
+
+    def __init__(self, pattern, repeat_cap=5):
+        self.pattern = pattern
+        self.repeat_cap = repeat_cap
+        self.root = _space(parse(pattern), repeat_cap)
+
+    def count(self):
+        return self.root.count
+
+    def nth(self, index):
+        if not 0 <= index < self.root.count:
+            raise IndexError(f"Index {index} out of range for {self.root.count} strings")
+        return self.root.nth(index)
+
+    def __iter__(self):
+        return iter(self.root)
+
+    def range(self, start, stop=None):
+        # Lazily yield the strings with indices start..stop-1, e.g. one worker's shard
+        stop = self.root.count if stop is None else min(stop, self.root.count)
+        for index in range(start, stop):
+            yield self.root.nth(index)
+
+
+def _space(node, repeat_cap):
+    if isinstance(node, Literal):
+        return _LiteralSpace(node.char)
+    if isinstance(node, Concat):
+        return _ConcatSpace([_space(item, repeat_cap) for item in node.items])
+    if isinstance(node, Alternation):
+        return _AlternationSpace([_space(option, repeat_cap) for option in node.options])
+    if isinstance(node, Repeat):
+        high = node.high if node.high is not None else max(node.low, repeat_cap)
+        return _RepeatSpace(_space(node.node, repeat_cap), node.low, high)
+    raise TypeError(f"Unknown node {node!r}")
+
+
+class _LiteralSpace:
+    def __init__(self, char):
+        self.char = char
+        self.count = 1
+
+    def nth(self, index):
+        return self.char
+
+    def __iter__(self):
+        yield self.char
+
+
+class _ConcatSpace:
+    def __init__(self, parts):
+        self.parts = parts
+        self.count = 1
+        for part in parts:
+            self.count *= part.count
+
+    def nth(self, index):
+        # Mixed-radix digits of index, last part least significant
+        pieces = []
+        for part in reversed(self.parts):
+            index, digit = divmod(index, part.count)
+            pieces.append(part.nth(digit))
+        return ''.join(reversed(pieces))
+
+    def __iter__(self):
+        return _product(self.parts)
+
+
+class _AlternationSpace:
+    def __init__(self, options):
+        self.options = options
+        self.count = sum(option.count for option in options)
+
+    def nth(self, index):
+        for option in self.options:
+            if index < option.count:
+                return option.nth(index)
+            index -= option.count
+
+    def __iter__(self):
+        return chain.from_iterable(self.options)
+
+
+class _RepeatSpace:
+    def __init__(self, part, low, high):
+        self.part = part
+        self.low = low
+        self.high = high
+        self.count = sum(part.count ** times for times in range(low, high + 1))
+
+    def nth(self, index):
+        for times in range(self.low, self.high + 1):
+            block = self.part.count ** times
+            if index < block:
+                pieces = []
+                for _ in range(times):
+                    index, digit = divmod(index, self.part.count)
+                    pieces.append(self.part.nth(digit))
+                return ''.join(reversed(pieces))
+            index -= block
+
+    def __iter__(self):
+        return chain.from_iterable(_product([self.part] * times)
+                                   for times in range(self.low, self.high + 1))
+
+
+def _product(spaces):
+    # Odometer over the spaces, in itertools.product order: the last space turns
+    # fastest, and a space is iterated again from its start whenever the one
+    # before it advances. Unlike product, which first stores every item of
+    # every space, only the current string of each space is held
+    iterators = [iter(space) for space in spaces]
+    pieces = [next(iterator, None) for iterator in iterators]
+    if None in pieces:
+        return
+    while True:
+        yield ''.join(pieces)
+        position = len(spaces) - 1
+        while position >= 0:
+            piece = next(iterators[position], None)
+            if piece is not None:
+                pieces[position] = piece
+                break
+            iterators[position] = iter(spaces[position])
+            pieces[position] = next(iterators[position])
+            position -= 1
+        if position < 0:
+            return
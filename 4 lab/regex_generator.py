@@ -0,0 +1,77 @@
+import random
+from functools import lru_cache
+
+from regex_ast import Alternation, Concat, Literal, Repeat, parse
+
+
+class RegexGenerator:
+    """Draws random strings matching a pattern of the lab's regex dialect.
+
+    The pattern is parsed once and turned into a tree of small closures that
+    append characters to an output list, so drawing a sample involves no
+    parsing and no I/O. repeat_cap bounds * and + repetitions; power_cap, if
+    set, also bounds exact ^N powers.
+    """
+
+    def __init__(self, pattern, repeat_cap=5, power_cap=None):
+        self.pattern = pattern
+        self.repeat_cap = repeat_cap
+        self.power_cap = power_cap
+        self._emit = self._compile(parse(pattern))
+
+    def _compile(self, node):
+        if isinstance(node, Literal):
+            char = node.char
+            return lambda rng, out: out.append(char)
+
+        if isinstance(node, Concat):
+            parts = [self._compile(item) for item in node.items]
+
+            def concat(rng, out):
+                for part in parts:
+                    part(rng, out)
+            return concat
+
+        if isinstance(node, Alternation):
+            if all(isinstance(option, Literal) for option in node.options):
+                chars = [option.char for option in node.options]
+                return lambda rng, out: out.append(rng.choice(chars))
+            options = [self._compile(option) for option in node.options]
+            return lambda rng, out: rng.choice(options)(rng, out)
+
+        if isinstance(node, Repeat):
+            part = self._compile(node.node)
+            low, high = node.low, node.high
+            if high is None:
+                high = max(low, self.repeat_cap)
+            elif low == high and self.power_cap is not None:
+                low = high = min(high, self.power_cap)
+
+            def repeat(rng, out):
+                for _ in range(low if low == high else rng.randint(low, high)):
+                    part(rng, out)
+            return repeat
+
+        raise TypeError(f"Unknown node {node!r}")
+
+    def sample(self, rng=None):
+        out = []
+        self._emit(rng if rng is not None else random, out)
+        return ''.join(out)
+
+    def sample_many(self, n, seed=None):
+        # Return n samples drawn from a generator seeded with seed
+        rng = random.Random(seed)
+        emit = self._emit
+        samples = []
+        for _ in range(n):
+            out = []
+            emit(rng, out)
+            samples.append(''.join(out))
+        return samples
+
+
+@lru_cache(maxsize=None)
+def get_generator(pattern, repeat_cap=5, power_cap=None):
+    # Generators are cached by pattern and caps, so repeated calls never re-parse
+    return RegexGenerator(pattern, repeat_cap, power_cap)
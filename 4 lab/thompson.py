@@ -0,0 +1,132 @@
+from functools import lru_cache
+
+from regex_ast import Alternation, Concat, Literal, Repeat, parse
+
+
+class ThompsonMatcher:
+    """Matches whole strings against a pattern through its Thompson NFA.
+
+    The NFA is built once from the parsed pattern. Its character-consuming
+    states become bit positions of a Python int, so a set of active states is
+    a single integer. Reading a character keeps only the positions labelled
+    with it (a Shift-And style mask) and maps them to their successors with
+    one precomputed table lookup per 8 positions, so matching is linear in
+    the length of the string.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.labels = []   # NFA state -> character it consumes, or None for ε-states
+        self.edges = []    # NFA state -> successor states
+        start, self.accept = self._build(parse(pattern))
+
+        # Character states are numbered as bit positions; one extra bit marks acceptance
+        self.positions = [state for state, label in enumerate(self.labels) if label is not None]
+        bit = {state: position for position, state in enumerate(self.positions)}
+        self.final = 1 << len(self.positions)
+        self.masks = {}
+        for position, state in enumerate(self.positions):
+            label = self.labels[state]
+            self.masks[label] = self.masks.get(label, 0) | (1 << position)
+
+        self.initial = self._closure(start, bit)
+        follow = [self._closure(self.edges[state][0], bit) for state in self.positions]
+        self.tables = []
+        for offset in range(0, len(follow), 8):
+            chunk = follow[offset:offset + 8]
+            table = [0] * (1 << len(chunk))
+            for byte in range(1, len(table)):
+                low = byte & -byte
+                table[byte] = table[byte ^ low] | chunk[low.bit_length() - 1]
+            self.tables.append(table)
+
+    def _new(self, label=None):
+        self.labels.append(label)
+        self.edges.append([])
+        return len(self.labels) - 1
+
+    def _build(self, node):
+        # Return the (entry, exit) states of the fragment for node; exit is an ε-state
+        # with no successors yet
+        if isinstance(node, Literal):
+            entry, exit = self._new(node.char), self._new()
+            self.edges[entry].append(exit)
+            return entry, exit
+        if isinstance(node, Concat):
+            entry = exit = self._new()
+            for item in node.items:
+                item_entry, item_exit = self._build(item)
+                self.edges[exit].append(item_entry)
+                exit = item_exit
+            return entry, exit
+        if isinstance(node, Alternation):
+            entry, exit = self._new(), self._new()
+            for option in node.options:
+                option_entry, option_exit = self._build(option)
+                self.edges[entry].append(option_entry)
+                self.edges[option_exit].append(exit)
+            return entry, exit
+        if isinstance(node, Repeat):
+            entry = exit = self._new()
+            for _ in range(node.low):
+                copy_entry, copy_exit = self._build(node.node)
+                self.edges[exit].append(copy_entry)
+                exit = copy_exit
+            if node.high is None:
+                loop_entry, loop_exit = self._build(node.node)
+                end = self._new()
+                self.edges[exit] += [loop_entry, end]
+                self.edges[loop_exit] += [loop_entry, end]
+                return entry, end
+            end = self._new()
+            for _ in range(node.high - node.low):
+                copy_entry, copy_exit = self._build(node.node)
+                self.edges[exit] += [copy_entry, end]
+                exit = copy_exit
+            self.edges[exit].append(end)
+            return entry, end
+        raise TypeError(f"Unknown node {node!r}")
+
+    def _closure(self, state, bit):
+        # Bitset of character states (and the final bit) reachable from state through ε-states
+        mask = 0
+        seen = {state}
+        stack = [state]
+        while stack:
+            current = stack.pop()
+            if self.labels[current] is not None:
+                mask |= 1 << bit[current]
+                continue
+            if current == self.accept:
+                mask |= self.final
+            for next_state in self.edges[current]:
+                if next_state not in seen:
+                    seen.add(next_state)
+                    stack.append(next_state)
+        return mask
+
+    def match(self, string):
+        state = self.initial
+        masks = self.masks
+        tables = self.tables
+        for char in string:
+            active = state & masks.get(char, 0)
+            if not active:
+                return False
+            state = 0
+            for table in tables:
+                state |= table[active & 255]
+                active >>= 8
+                if not active:
+                    break
+        return bool(state & self.final)
+
+    def match_many(self, strings):
+        match = self.match
+        return [match(string) for string in strings]
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern):
+    # Matchers are cached by pattern text, so each pattern is compiled only once
+    return ThompsonMatcher(pattern)
@@ -1,5 +1,16 @@
 from enum import Enum
-import re
+import os
+import sys
+
+# The scanning engine is shared with the lab 3 lexer; its folder is on the import
+# path only while the two modules are imported
+_LAB3 = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '3 lab')
+sys.path.insert(0, _LAB3)
+try:
+    from lexer_generator import TokenScanner
+    from token_buffer import TokenBuffer
+finally:
+    sys.path.remove(_LAB3)
 
 class TokenType(Enum):
     INTEGER = 'INTEGER'
@@ -9,9 +20,13 @@ class TokenType(Enum):
     DIVIDE = 'DIVIDE'
     LPAREN = 'LPAREN'
     RPAREN = 'RPAREN'
+    WHITESPACE = 'WHITESPACE'
+    ERROR = 'ERROR'
     EOF = 'EOF'
 
 class Token:
+    __slots__ = ('type', 'value')
+
     def __init__(self, type, value):
         self.type = type
         self.value = value
@@ -20,37 +35,84 @@ class Token:
         return f'Token({self.type.name}, {repr(self.value)})'
 
 class Lexer:
+    token_specification = [
+        (TokenType.INTEGER, r'\d+'),
+        (TokenType.PLUS, r'\+'),
+        (TokenType.MINUS, r'\-'),
+        (TokenType.TIMES, r'\*'),
+        (TokenType.DIVIDE, r'\/'),
+        (TokenType.LPAREN, r'\('),
+        (TokenType.RPAREN, r'\)'),
+        (TokenType.WHITESPACE, r'\s+'),
+        (TokenType.EOF, r'\Z')
+    ]
+    _scanner = None
+
     def __init__(self, text):
         self.text = text
         self.pos = 0
         self.current_token = None
         self.tokens = []
 
+    @classmethod
+    def scanner(cls):
+        # The specification is compiled into one master pattern once per class, not on
+        # every call; whitespace is matched in front of the next token
+        if cls._scanner is None:
+            cls._scanner = TokenScanner(cls.token_specification, skip={TokenType.WHITESPACE})
+        return cls._scanner
+
     def error(self):
         raise Exception('Invalid character')
 
     def tokenize(self):
-        token_specification = [
-            (TokenType.INTEGER, r'\d+'),
-            (TokenType.PLUS, r'\+'),
-            (TokenType.MINUS, r'\-'),
-            (TokenType.TIMES, r'\*'),
-            (TokenType.DIVIDE, r'\/'),
-            (TokenType.LPAREN, r'\('),
-            (TokenType.RPAREN, r'\)'),
-            (TokenType.EOF, r'\Z')
-        ]
-
-        token_regex = '|'.join(f'(?P<{tok.name}>{pattern})' for tok, pattern in token_specification)
-        for mo in re.finditer(token_regex, self.text):
-            kind = mo.lastgroup
-            value = mo.group()
-            tok_type = TokenType[kind]
-            if tok_type == TokenType.INTEGER:
-                value = int(value)  # Convert to integer
-            self.tokens.append(Token(tok_type, value))
-
-        self.tokens.append(Token(TokenType.EOF, None))
+        self.tokens = list(self.stream())
+
+    def stream(self):
+        # Lazily yield tokens, ending with a single EOF; a character no rule matches
+        # becomes an ERROR token holding it
+        text = self.text
+        scanner = self.scanner()
+        group_kinds = scanner.group_kinds
+        position = 0
+        while True:
+            # Matches follow each other without gaps and stop where no token starts
+            match = None
+            for match in iter(scanner.pattern.scanner(text, position).match, None):
+                index = match.lastindex
+                tok_type = group_kinds[index]
+                value = match.group(index)
+                if tok_type is TokenType.INTEGER:
+                    value = int(value)  # Convert to integer
+                yield Token(tok_type, value)
+            if match is not None:
+                position = match.end()
+            position = scanner.skip(text, position)
+            if position >= len(text):
+                break
+            yield Token(TokenType.ERROR, text[position])
+            position += 1
+        yield Token(TokenType.EOF, None)
+
+    def tokenize_buffer(self):
+        # Column storage of the same tokens; values are only converted when read
+        buffer = TokenBuffer(self.text, TokenType, self.make_token)
+        for tok_type, start, end in self._matches():
+            buffer.append(tok_type, start, end)
+        return buffer
+
+    def _matches(self):
+        for tok_type, start, end in self.scanner().scan(self.text):
+            yield tok_type or TokenType.ERROR, start, end
+
+    @staticmethod
+    def make_token(tok_type, text, start, end):
+        if tok_type == TokenType.EOF:
+            return Token(tok_type, None)
+        value = text[start:end]
+        if tok_type == TokenType.INTEGER:
+            value = int(value)  # Convert to integer
+        return Token(tok_type, value)
 
 class AST:
     pass
@@ -81,17 +143,15 @@ def print_ast(node, level=0):
 class Parser:
     def __init__(self, lexer):
         self.lexer = lexer
-        self.tokens = lexer.tokens
+        # Tokens are pulled from the lexer one at a time as parsing proceeds
+        self.tokens = lexer.stream()
         self.current_token = None
-        self.pos = -1
         self.advance()
 
     def advance(self):
-        self.pos += 1
-        if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
-        else:
-            self.current_token = Token(TokenType.EOF, None)
+        self.current_token = next(self.tokens, None) or Token(TokenType.EOF, None)
+        if self.current_token.type == TokenType.ERROR:
+            self.lexer.error()
 
     def error(self):
         raise Exception('Invalid syntax')
@@ -148,17 +208,16 @@ def main():
     # Input arithmetic expression with new operators and parentheses
     text = "3 + 4 * (2 - 1)"
 
-    # Create a lexer and tokenize the input text
+    # Create a lexer for the input text
     lexer = Lexer(text)
-    lexer.tokenize()
 
-    # Create a parser and parse the tokens into an AST
+    # Create a parser and parse the tokens into an AST as the lexer produces them
     parser = Parser(lexer)
     ast = parser.parse()
 
     # Print tokens generated by lexer
     print("Tokens:")
-    for token in lexer.tokens:
+    for token in lexer.stream():
         print(token)
 
     # Print AST generated by parser